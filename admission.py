@@ -0,0 +1,160 @@
+"""Admission control for background jobs: global and per-user/per-key caps, a fair queue, load shedding.
+
+Without it every submitted crew starts as soon as a worker is free, in
+submission order, so one user queueing several analyses delays everyone
+and all runs compete for the same LLM and search quotas. Here:
+
+- at most ``max_running`` crews run at once in the process; a job that
+  runs several crews side by side (a batch) counts as that many,
+- one user (and one API key) can only have a few jobs running at a time,
+- queued jobs are started round-robin across users, so a user's fifth job
+  never goes ahead of another user's first,
+- new jobs are refused with Overloaded once the queue (or a user's share
+  of it) is full, instead of making every queued run wait longer.
+
+"User" is sessions.client_id, a per-browser cookie: it spreads capacity
+fairly between ordinary visitors, but anyone can get a fresh one by clearing
+cookies or opening a private window. The per-user caps are therefore not a
+defence against deliberate abuse; the per-key cap (and the global caps) are
+the limits that actually bind, since each job must bring its own API key.
+
+Queue position and an ETA, from a moving average of recent run times, are
+available for every queued job. The queue lives in the process that runs
+the jobs; every jobs.JobManager in the process shares ``get_admission_queue()``.
+"""
+import math
+import os
+import threading
+from collections import Counter, OrderedDict, deque
+
+MAX_RUNNING = int(os.getenv("JOB_WORKERS", 2))
+MAX_RUNNING_PER_USER = int(os.getenv("JOBS_PER_USER", 1))
+MAX_RUNNING_PER_KEY = int(os.getenv("JOBS_PER_KEY", 2))
+MAX_QUEUE_DEPTH = int(os.getenv("JOB_QUEUE_MAX", 20))
+MAX_QUEUED_PER_USER = int(os.getenv("JOBS_QUEUED_PER_USER", 3))
+DEFAULT_RUN_TIME = float(os.getenv("JOB_DEFAULT_RUN_TIME", 180))
+
+# Weight of the newest run in the run-time moving average
+RUN_TIME_SMOOTHING = 0.3
+
+
+class Overloaded(Exception):
+    """Raised by AdmissionQueue.enqueue when the job is shed instead of queued."""
+
+
+class AdmissionQueue:
+    """Thread-safe fair queue; ``next_ready`` hands out the jobs that may start now."""
+
+    def __init__(self, max_running, max_per_user=MAX_RUNNING_PER_USER, max_per_key=MAX_RUNNING_PER_KEY,
+                 max_queue=MAX_QUEUE_DEPTH, max_queued_per_user=MAX_QUEUED_PER_USER):
+        self.max_running = max_running
+        self.max_per_user = max_per_user
+        self.max_per_key = max_per_key
+        self.max_queue = max_queue
+        self.max_queued_per_user = max_queued_per_user
+        self.run_time = DEFAULT_RUN_TIME
+        self.shed = 0
+        # Held by JobManagers around enqueue and dispatch, so a job is never
+        # started by one manager before the manager that queued it has stored it
+        self.submit_lock = threading.RLock()
+        # User -> their queued (job_id, key, weight, payload); dict order is the round-robin order
+        self._queues = OrderedDict()
+        self._running = {}
+        self._slots = 0
+        self._running_by_user = Counter()
+        self._running_by_key = Counter()
+        self._lock = threading.Lock()
+
+    def depth(self):
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def enqueue(self, job_id, user, key=None, weight=1, payload=None):
+        """Queue ``job_id``; raises Overloaded when the queue or the user's share of it is full.
+
+        ``weight`` is the number of crews the job runs at once (at most
+        ``max_running``); ``payload`` is handed back by ``next_ready``.
+        """
+        with self._lock:
+            depth = sum(len(queue) for queue in self._queues.values())
+            if depth >= self.max_queue:
+                self.shed += 1
+                raise Overloaded(f"The server is busy ({depth} analyses waiting). Please try again in a few minutes.")
+            queued = self._queues.get(user, ())
+            if len(queued) >= self.max_queued_per_user:
+                self.shed += 1
+                raise Overloaded(f"You already have {len(queued)} analyses waiting. "
+                                 f"Please wait for one of them to start.")
+            weight = max(1, min(weight, self.max_running))
+            self._queues.setdefault(user, deque()).append((job_id, key, weight, payload))
+
+    def next_ready(self):
+        """Take the next job allowed to start, as ``(job_id, user, key, payload)``, or None.
+
+        Users are visited round-robin; a user whose own or whose API key's
+        running jobs are at their limit is skipped for now. A job that needs
+        more free slots than there are waits, and holds back the jobs behind
+        it, so a batch is not starved by a stream of single analyses.
+        """
+        with self._lock:
+            if self._slots >= self.max_running:
+                return None
+            for user, queue in list(self._queues.items()):
+                job_id, key, weight, payload = queue[0]
+                if self._running_by_user[user] >= self.max_per_user:
+                    continue
+                if key is not None and self._running_by_key[key] >= self.max_per_key:
+                    continue
+                if self._slots + weight > self.max_running:
+                    return None
+                queue.popleft()
+                # The user goes to the back of the rotation
+                del self._queues[user]
+                if queue:
+                    self._queues[user] = queue
+                self._running[job_id] = (user, key, weight)
+                self._slots += weight
+                self._running_by_user[user] += 1
+                if key is not None:
+                    self._running_by_key[key] += 1
+                return job_id, user, key, payload
+            return None
+
+    def finish(self, job_id, run_time=None):
+        with self._lock:
+            user, key, weight = self._running.pop(job_id)
+            self._slots -= weight
+            self._running_by_user[user] -= 1
+            if key is not None:
+                self._running_by_key[key] -= 1
+            if run_time is not None:
+                self.run_time += RUN_TIME_SMOOTHING * (run_time - self.run_time)
+
+    def position(self, job_id):
+        """``(jobs_ahead, eta_seconds)`` for a queued job, or None when it is not queued here.
+
+        The order is the round-robin order ignoring per-user limits, so the
+        ETA is an estimate: each group of ``max_running`` jobs ahead adds one
+        average run time.
+        """
+        with self._lock:
+            queues = [list(queue) for queue in self._queues.values()]
+        order = [queue[index][0] for index in range(max(map(len, queues), default=0))
+                 for queue in queues if index < len(queue)]
+        if job_id not in order:
+            return None
+        ahead = order.index(job_id)
+        return ahead, math.ceil((ahead + 1) / max(1, self.max_running)) * self.run_time
+
+
+_admission = None
+_admission_lock = threading.Lock()
+
+
+def get_admission_queue():
+    """The process-wide AdmissionQueue, shared by single analyses and batches."""
+    global _admission
+    with _admission_lock:
+        if _admission is None:
+            _admission = AdmissionQueue(max_running=MAX_RUNNING)
+        return _admission
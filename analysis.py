@@ -0,0 +1,181 @@
+"""Run one JobFlowAI analysis outside of any Streamlit script."""
+import hashlib
+import os
+import uuid
+from blob_store import LocalBlobStore
+from budgets import BudgetTracker
+from cache import PersistentCache
+from dag_executor import kickoff_graph
+from evidence import EvidenceStore
+from metrics import RunMetrics
+from prompts import PROMPT_MODE, prompt_report
+from report import assemble_report
+from report_store import ReportStore
+from resume_parser import RESUME_SUFFIXES, get_parser, resume_suffix
+from schemas import SCHEMA_VERSION
+from snapshots import IncrementalRun, SnapshotStore
+from task_cache import TaskCache
+
+KNOWLEDGE_DIR = os.path.join(os.getcwd(), "knowledge")
+
+# Uploaded resumes, named by content hash so concurrent sessions never collide
+resume_store = LocalBlobStore(os.path.join(KNOWLEDGE_DIR, "resumes"))
+RESUME_MAX_AGE = int(os.getenv("RESUME_MAX_AGE", 7 * 24 * 3600))
+RESUME_MAX_FILES = int(os.getenv("RESUME_MAX_FILES", 500))
+
+# Resumes referenced by saved JOB_PREFERENCES rows; never evicted
+saved_resume_store = LocalBlobStore(os.getenv("RESUME_STORE_DIR", os.path.join("data", "resumes")))
+
+# The ReportMaster task; its output is the final report rather than a section
+FINAL_TASK = "report_master"
+
+# Company-level task outputs shared by all sessions
+task_cache = TaskCache(PersistentCache(os.path.join("data", "task_cache.sqlite3"), table="task_outputs"))
+
+# What earlier analyses of each (company, role) found
+snapshot_store = SnapshotStore()
+
+# Finished reports, so viewing or sharing one later is a disk read
+report_store = ReportStore()
+
+
+def save_resume(data, keep=False):
+    """Store an uploaded resume (PDF or DOCX bytes, or a binary file object) and return its hash.
+
+    Analysis uploads go to ``resume_store``: bytes that are already stored
+    are not rewritten, and new uploads also run the LRU/TTL cleanup. With
+    ``keep`` the file goes to ``saved_resume_store`` instead, which is never
+    cleaned up, because saved CareerSync preferences refer to it by hash.
+    File objects are copied in chunks instead of being read into memory.
+    Parsing starts in the background right away, so the text is usually
+    ready by the time an analysis needs it. Raises ValueError for other
+    file types.
+    """
+    store = saved_resume_store if keep else resume_store
+    if hasattr(data, "read"):
+        data.seek(0)
+        suffix = resume_suffix(data.read(8))
+        data.seek(0)
+        digest = store.put_stream(data, suffix)
+        new = True
+    else:
+        suffix = resume_suffix(data)
+        digest = hashlib.sha256(data).hexdigest()
+        new = not store.exists(digest, suffix)
+        if new:
+            store.put_bytes(data, suffix)
+    if not keep:
+        # put_stream keeps an existing copy as it is; mark it used either way
+        resume_store.touch(digest, suffix)
+        if new:
+            resume_store.evict(max_age=RESUME_MAX_AGE, max_files=RESUME_MAX_FILES)
+    get_parser().submit(store.path_for(digest, suffix), digest)
+    return digest
+
+
+def resume_path(digest):
+    """Path of the stored resume with hash ``digest``, or None when it has expired."""
+    for suffix in RESUME_SUFFIXES.values():
+        if resume_store.exists(digest, suffix):
+            return resume_store.path_for(digest, suffix)
+    return None
+
+
+def get_embedder(api_key):
+    from resume_index import GoogleEmbedder, HashingEmbedder
+
+    # RESUME_EMBEDDER=local swaps in the deterministic offline embedder
+    if os.getenv("RESUME_EMBEDDER") == "local":
+        return HashingEmbedder()
+    # The job's own key first: GEMINI_API_KEY may have been set by another session
+    return GoogleEmbedder(api_key=api_key or os.getenv("GEMINI_API_KEY"))
+
+
+def load_resume(params):
+    """Embedder and ResumeIndex for ``params["resume_hash"]``.
+
+    The resume is parsed and embedded once per content hash, then reused.
+    Raises FileNotFoundError when the upload has expired from the store.
+    """
+    from resume_index import load_or_build_index
+
+    embedder = get_embedder(params["api_key"])
+    path = resume_path(params["resume_hash"])
+    if path is None:
+        raise FileNotFoundError("The uploaded resume has expired. Please upload it again.")
+    # The modification time is the blob store's last-used time
+    os.utime(path)
+    return embedder, load_or_build_index(path, embedder)
+
+
+def run_analysis(params, on_task_complete=None, run_id=None):
+    """Build the crew for ``params`` and run it.
+
+    ``params`` holds the form inputs (company_name, role, experience,
+    university_name) plus model, api_key, resume_hash, execution_mode,
+    max_concurrency, use_task_cache, routing, incremental, ats_prescore,
+    compact_prompts and client_id. ``on_task_complete(task, output)`` is
+    forwarded to kickoff_graph. Run metrics are exported as JSON under
+    ``run_id`` (see metrics.load_run_metrics), together with the budget usage,
+    and the report is saved to ``report_store`` under the same ID, owned by
+    ``client_id``.
+    Returns the final CrewOutput, whose ``raw`` is the assembled report.
+    """
+    embedder, resume_index = load_resume(params)
+    return run_crew(params, embedder, resume_index, on_task_complete=on_task_complete, run_id=run_id)
+
+
+def run_crew(params, embedder, resume_index, on_task_complete=None, run_id=None):
+    """Run one analysis against an already loaded resume index (see run_analysis)."""
+    # crewai, langchain and numpy are only imported once the first analysis runs
+    from ats_scorer import ATSPreScorer
+    from crew_factory import new_crew
+    from llm_router import LLM_TIERS
+    from tools import search_tool
+
+    metrics = RunMetrics(run_id or uuid.uuid4().hex)
+    routing = params.get("routing", True)
+    compact = params.get("compact_prompts", PROMPT_MODE == "compact")
+    crew = new_crew(params["model"], params["api_key"], routing, compact)
+    if routing:
+        model_scope = "routed:" + ",".join(tier["model"] for tier in LLM_TIERS.values())
+    else:
+        model_scope = params["model"]
+
+    inputs = {
+        "company_name": params["company_name"],
+        "role": params["role"],
+        "experience": params["experience"],
+        "university_name": params["university_name"]
+    }
+    sequential = params.get("execution_mode") == "Sequential"
+    budget = BudgetTracker()
+    # Chunks overlap, which does not matter for keyword matching
+    prescorer = ATSPreScorer("\n".join(resume_index.chunks)) if params.get("ats_prescore", True) else None
+    history = IncrementalRun(snapshot_store, params["company_name"], params["role"],
+                             incremental=params.get("incremental", False))
+    try:
+        result = kickoff_graph(
+            crew,
+            inputs=inputs,
+            max_concurrency=1 if sequential else params.get("max_concurrency", 4),
+            sequential=sequential,
+            task_cache=task_cache if params.get("use_task_cache", True) else None,
+            cache_scope={"model": model_scope, "resume": resume_index.digest, "schema": SCHEMA_VERSION,
+                         "compact": compact},
+            on_task_complete=on_task_complete,
+            knowledge=lambda descriptions: resume_index.context_for(descriptions, embedder),
+            metrics=metrics,
+            evidence=EvidenceStore(search_tool),
+            budget=budget,
+            history=history,
+            prescorer=prescorer
+        )
+    finally:
+        metrics.budget = budget.report()
+        metrics.prompts = prompt_report(crew)
+        metrics.export()
+    # ReportMaster only wrote the narrative; the sections come from the typed outputs
+    result.raw = assemble_report(inputs, result.tasks_output, changes=history.changes_section())
+    report_store.save(metrics.run_id, inputs, result, owner=params.get("client_id"))
+    return result
@@ -0,0 +1,182 @@
+"""Local, deterministic ATS pre-scoring of job openings against a resume.
+
+ATS_Agent used to read every opening JobScout found and write an LLM
+evaluation for each one. Here the resume and every job description are
+reduced to keywords (words and two-word phrases), weighted with TF-IDF over
+the openings and scored in one NumPy batch: an opening's score is the share
+of its keyword weight that the resume covers. Only the ATS_TOP_N best
+openings, with their matched and missing keywords, are handed to ATS_Agent,
+so the LLM writes feedback for a shortlist instead of a whole careers page.
+
+Runs fully offline:
+
+    python ats_scorer.py --resume resume.pdf --openings openings.json --top-n 5
+"""
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+
+from report import structured
+
+ATS_TOP_N = int(os.getenv("ATS_TOP_N", 5))
+
+# The task that gets the shortlist and the task whose openings are scored
+ATS_TASK = "ats_agent"
+OPENINGS_TASK = "job_scout"
+
+MAX_KEYWORDS = 8
+MAX_DESCRIPTION = 600
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
+# Phrases never span list separators or sentence ends
+_SEGMENT_PATTERN = re.compile(r"[,;:()|/\n•]+|\.(?:\s|$)")
+
+# Common English words and job-ad boilerplate that say nothing about fit
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could do does
+for from has have having he her his how i if in into is it its join just like looking may more most
+must my no not of on or our out over own per plus preferred required requirements responsibilities
+role she should so some such than that the their them then there these they this those through to
+under up us using via was we well were what when where which while who will with within work working
+would year years you your ability able experience experienced strong excellent good great knowledge
+skills skill understanding team teams including etc new candidate candidates position opportunity
+""".split())
+
+
+def keywords(text):
+    """Keyword counts of ``text``: non-stopword tokens plus adjacent two-word phrases."""
+    counts = {}
+    for segment in _SEGMENT_PATTERN.split((text or "").lower()):
+        previous = None
+        for token in _TOKEN_PATTERN.findall(segment):
+            if token in STOPWORDS or (len(token) < 2 and token not in ("c", "r")):
+                previous = None
+                continue
+            counts[token] = counts.get(token, 0) + 1
+            if previous:
+                phrase = f"{previous} {token}"
+                counts[phrase] = counts.get(phrase, 0) + 1
+            previous = token
+    return counts
+
+
+def score_openings(resume_text, openings):
+    """Local ATS scores of ``openings`` (dicts with title and description), best first.
+
+    Each result holds the opening's ``index``, its ``score`` out of 100 and
+    its highest-weighted ``matched`` and ``missing`` keywords.
+    """
+    if not openings:
+        return []
+    docs = [keywords(f"{opening.get('title', '')}\n{opening.get('description', '')}") for opening in openings]
+    resume = keywords(resume_text)
+    vocabulary = sorted({term for doc in docs for term in doc})
+    column = {term: position for position, term in enumerate(vocabulary)}
+
+    counts = np.zeros((len(docs), len(vocabulary)), dtype=np.float32)
+    for row, doc in enumerate(docs):
+        for term, count in doc.items():
+            counts[row, column[term]] = count
+    document_frequency = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(docs)) / (1 + document_frequency)) + 1
+    # Sublinear term frequency, so a keyword repeated in one ad does not dominate it
+    weights = np.log1p(counts) * idf
+    present = np.array([term in resume for term in vocabulary], dtype=np.float32)
+
+    totals = weights.sum(axis=1)
+    coverage = np.divide(weights @ present, totals, out=np.zeros_like(totals), where=totals > 0)
+    order = np.argsort(-weights, axis=1, kind="stable")
+
+    results = []
+    for row in range(len(docs)):
+        ranked = [vocabulary[position] for position in order[row] if weights[row, position] > 0]
+        results.append({
+            "index": row,
+            "score": int(round(float(coverage[row]) * 100)),
+            "matched": [term for term in ranked if term in resume][:MAX_KEYWORDS],
+            "missing": [term for term in ranked if term not in resume][:MAX_KEYWORDS],
+        })
+    results.sort(key=lambda result: (-result["score"], result["index"]))
+    return results
+
+
+class ATSPreScorer:
+    """Replaces ATS_Agent's dependency context with a locally scored shortlist.
+
+    ``context_for(task, dep_outputs)`` is asked for every task by
+    dag_executor.kickoff_graph and returns None for other tasks, or when
+    JobScout's output has no parseable openings, so the agent then sees the
+    full JobScout output as before.
+    """
+
+    def __init__(self, resume_text, top_n=ATS_TOP_N):
+        self.resume_text = resume_text
+        self.top_n = top_n
+        self.scores = []
+
+    def context_for(self, task, dep_outputs):
+        if task.name != ATS_TASK:
+            return None
+        source = next((output for output in dep_outputs if output.name == OPENINGS_TASK), None)
+        data = structured(OPENINGS_TASK, source)
+        if data is None or not data.openings:
+            return None
+        openings = [opening.model_dump() for opening in data.openings]
+        self.scores = score_openings(self.resume_text, openings)
+        shortlist, rest = self.scores[:self.top_n], self.scores[self.top_n:]
+
+        lines = [f"JobScout found {len(openings)} openings. A local keyword match against the resume ranked them; "
+                 f"evaluate only these {len(shortlist)}, best local match first, and use the keywords as a starting "
+                 f"point for the skills and keyword parts of the score."]
+        for result in shortlist:
+            opening = openings[result["index"]]
+            lines += [
+                "",
+                f"Job role: {opening['title']}" + (f" ({opening['location']})" if opening["location"] else ""),
+                f"Link: {opening['url'] or 'n/a'}",
+                f"Local keyword score: {result['score']}/100",
+                f"Matched keywords: {', '.join(result['matched']) or 'none'}",
+                f"Missing keywords: {', '.join(result['missing']) or 'none'}",
+                f"Description: {opening['description'][:MAX_DESCRIPTION]}",
+            ]
+        if rest:
+            lines += ["", "Scored lower locally and not to be evaluated: " + ", ".join(
+                f"{openings[result['index']]['title']} ({result['score']})" for result in rest)]
+        if data.careers_page:
+            lines += ["", f"Careers page: {data.careers_page}"]
+        return "\n".join(lines)
+
+
+def _read_resume(path):
+    if path.lower().endswith((".pdf", ".docx")):
+        from resume_parser import parse_file
+
+        return parse_file(path)["text"]
+    with open(path) as f:
+        return f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank job openings against a resume without any LLM call")
+    parser.add_argument("--resume", required=True, help="Resume as PDF, DOCX or plain text")
+    parser.add_argument("--openings", required=True,
+                        help="JSON file: a JobOpenings object or a list of {title, description} objects")
+    parser.add_argument("--top-n", type=int, default=ATS_TOP_N)
+    args = parser.parse_args()
+
+    with open(args.openings) as f:
+        openings = json.load(f)
+    if isinstance(openings, dict):
+        openings = openings.get("openings", [])
+    for rank, result in enumerate(score_openings(_read_resume(args.resume), openings), start=1):
+        marker = "*" if rank <= args.top_n else " "
+        print(f"{marker}{rank:>3}. {result['score']:>3}/100  {openings[result['index']].get('title', '')}")
+        print(f"       matched: {', '.join(result['matched']) or '-'}")
+        print(f"       missing: {', '.join(result['missing']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
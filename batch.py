@@ -0,0 +1,179 @@
+"""Analyze one resume against many (company, role) targets in a single job.
+
+The resume is parsed and embedded once, every item shares the search cache,
+the task cache and the LLM clients of the cached crew template, and items
+run side by side up to ``batch_concurrency``. A batch therefore costs about
+``ceil(items / batch_concurrency)`` single analyses instead of one per item.
+The result is a comparison report with every item's ATS score side by side.
+
+    python batch.py --resume resume.pdf --targets targets.csv --university "IIT Bombay" --output comparison.md
+"""
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from analysis import load_resume, run_crew, save_resume
+from report import structured
+
+TARGET_COLUMNS = ("company_name", "role", "experience")
+ATS_TASK = "ats_agent"
+BATCH_ITEM_EVENT = "batch_item"
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", 50))
+
+# "78/100", "78%", "78 out of 100", then "ATS score: 78"
+ATS_SCORE_PATTERNS = [
+    re.compile(r"(\d{1,3})\s*(?:/\s*100|%|out of 100)", re.I),
+    re.compile(r"score\D{0,20}?(\d{1,3})", re.I),
+]
+
+
+def read_targets(file):
+    """Rows of a CSV with company_name, role and experience columns.
+
+    Header names are matched case-insensitively, with spaces read as
+    underscores; an optional university_name column overrides the batch's.
+    Raises ValueError when a required column is missing or there are too
+    many rows.
+    """
+    text = file.read() if hasattr(file, "read") else file
+    if isinstance(text, bytes):
+        text = text.decode("utf-8-sig")
+    reader = csv.DictReader(io.StringIO(text))
+    fields = {re.sub(r"\s+", "_", (name or "").strip().lower()): name for name in reader.fieldnames or []}
+    missing = [column for column in TARGET_COLUMNS if column not in fields]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+
+    targets = []
+    for row in reader:
+        target = {column: (row.get(name) or "").strip() for column, name in fields.items()}
+        if target["company_name"] and target["role"]:
+            targets.append(target)
+    if len(targets) > MAX_BATCH_ITEMS:
+        raise ValueError(f"A batch can hold at most {MAX_BATCH_ITEMS} targets, got {len(targets)}")
+    return targets
+
+
+def extract_ats_score(output):
+    """Best ATS score of the ATS_Agent output, or the first 0-100 score in its text."""
+    data = structured(ATS_TASK, output)
+    if data is not None and data.evaluations:
+        return max(evaluation.ats_score for evaluation in data.evaluations)
+    for pattern in ATS_SCORE_PATTERNS:
+        for match in pattern.finditer(getattr(output, "raw", output) or ""):
+            score = int(match.group(1))
+            if 0 <= score <= 100:
+                return score
+    return None
+
+
+def run_batch(params, on_task_complete=None, run_id=None):
+    """Run every target in ``params["targets"]`` and return the comparison report.
+
+    ``params`` holds the same settings as analysis.run_analysis, without the
+    per-item company_name, role and experience, plus ``targets`` (see
+    read_targets) and ``batch_concurrency``. Each finished item is reported
+    through ``on_task_complete(task, output, title)`` with its final report.
+    Item metrics are exported under ``{run_id}-{position}``.
+    """
+    run_id = run_id or uuid.uuid4().hex
+    targets = params["targets"]
+    if not targets:
+        raise ValueError("The batch has no targets")
+    embedder, resume_index = load_resume(params)
+
+    def run_item(position, target):
+        item = {key: target.get(key) or "" for key in TARGET_COLUMNS}
+        item_params = {**params, **item}
+        # A blank university_name cell keeps the batch's own
+        if target.get("university_name"):
+            item_params["university_name"] = target["university_name"]
+        try:
+            output = run_crew(item_params, embedder, resume_index, run_id=f"{run_id}-{position}")
+        except Exception as e:
+            return {**item, "error": str(e), "ats_score": None, "report": ""}
+
+        ats_output = next((task for task in output.tasks_output if task.name == ATS_TASK), None)
+        item.update(error=None, report=output.raw,
+                    ats_score=extract_ats_score(ats_output) if ats_output else None)
+        if on_task_complete:
+            on_task_complete(SimpleNamespace(name=BATCH_ITEM_EVENT, agent=None), output,
+                             title=f"{item['company_name']} · {item['role']}")
+        return item
+
+    workers = max(1, min(params.get("batch_concurrency", 2), len(targets)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-item") as pool:
+        results = list(pool.map(run_item, range(len(targets)), targets))
+
+    if all(result["error"] for result in results):
+        raise RuntimeError(f"Every batch item failed; first error: {results[0]['error']}")
+    return comparison_report(results)
+
+
+def comparison_report(results):
+    """Markdown table of all items, best ATS score first, then each item's report."""
+    ranked = sorted(results, key=lambda result: (result["ats_score"] is None, -(result["ats_score"] or 0)))
+    lines = [
+        "# Batch comparison",
+        "",
+        "| Company | Role | Experience | ATS score | Status |",
+        "| --- | --- | --- | --- | --- |",
+    ]
+    for result in ranked:
+        score = "—" if result["ats_score"] is None else f"{result['ats_score']}/100"
+        status = f"failed: {result['error']}" if result["error"] else "done"
+        lines.append(f"| {result['company_name']} | {result['role']} | {result['experience']} | {score} | {status} |")
+    for result in ranked:
+        if result["report"]:
+            lines += ["", f"## {result['company_name']} · {result['role']}", "", result["report"]]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resume", required=True, help="Resume PDF or DOCX")
+    parser.add_argument("--targets", required=True, help="CSV with company_name, role, experience columns")
+    parser.add_argument("--university", default="", help="University name used by AlumniConnector")
+    parser.add_argument("--model", default="gemini/gemini-2.0-flash-lite")
+    parser.add_argument("--no-routing", action="store_true", help="Run every agent on --model")
+    parser.add_argument("--concurrency", type=int, default=2, help="Items analyzed at the same time")
+    parser.add_argument("--agent-concurrency", type=int, default=4, help="Agents run at the same time per item")
+    parser.add_argument("--output", help="Write the comparison report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        parser.error("Set GEMINI_API_KEY")
+    with open(args.resume, "rb") as f:
+        resume_hash = save_resume(f.read())
+    with open(args.targets, newline="") as f:
+        targets = read_targets(f)
+
+    report = run_batch({
+        "targets": targets,
+        "university_name": args.university,
+        "model": args.model,
+        "api_key": api_key,
+        "resume_hash": resume_hash,
+        "execution_mode": "Parallel",
+        "max_concurrency": args.agent_concurrency,
+        "use_task_cache": True,
+        "routing": not args.no_routing,
+        "batch_concurrency": args.concurrency,
+    })
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
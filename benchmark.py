@@ -0,0 +1,246 @@
+"""Offline benchmark for the JobFlowAI crew pipeline.
+
+Runs the real agents, tasks and dag_executor headless, but answers every LLM
+and search call from recorded fixtures (benchmarks/fixtures.json) with
+injected latencies, so it needs no network and no API keys. Reports
+end-to-end and per-task wall time, call counts and peak memory per scenario,
+and can fail when a run is slower than a saved baseline:
+
+    python benchmark.py --output bench_results.json
+    python benchmark.py --baseline bench_results.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from crewai import LLM
+from pydantic import BaseModel, Field
+
+from budgets import BudgetTracker
+from cache import PersistentCache
+from crew_factory import build_crew
+from dag_executor import kickoff_graph
+from evidence import EvidenceStore
+from metrics import RunMetrics, current_task
+from prompts import prompt_report
+from resume_index import HashingEmbedder, ResumeIndex, chunk_text
+from task_cache import TaskCache
+from tools import cached_search_tool, normalize_query
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fixtures.json")
+SEARCH_TOOL_NAME = "Search the internet"
+
+
+class Latency:
+    """Seeded ``mean +/- jitter`` delays, scaled for faster runs."""
+
+    def __init__(self, mean, jitter, scale=1.0, seed=0):
+        self.mean = mean
+        self.jitter = jitter
+        self.scale = scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self):
+        with self._lock:
+            delay = self._random.uniform(self.mean - self.jitter, self.mean + self.jitter)
+        time.sleep(max(0.0, delay) * self.scale)
+
+
+class ReplayLLM(LLM):
+    """Answers each task's LLM calls with its recorded steps, in order.
+
+    A ``{"search": query}`` step becomes a ReAct tool call, an ``{"answer":
+    text}`` step a final answer. The calling task is taken from the metrics
+    context that dag_executor sets for every task.
+    """
+
+    def __init__(self, steps, inputs, latency):
+        super().__init__(model="replay/offline")
+        self.steps = steps
+        self.inputs = inputs
+        self.latency = latency
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def call(self, *args, **kwargs):
+        task_name = current_task()
+        with self._lock:
+            position = self._positions.get(task_name, 0)
+            self._positions[task_name] = position + 1
+
+        self.latency.sleep()
+        steps = self.steps.get(task_name) or [{"answer": "No recorded output."}]
+        step = steps[min(position, len(steps) - 1)]
+        if "search" in step:
+            query = step["search"].format(**self.inputs)
+            return (
+                f"Thought: I should search for this.\nAction: {SEARCH_TOOL_NAME}\n"
+                f"Action Input: {json.dumps({'search_query': query})}"
+            )
+        return f"Thought: I now know the final answer\nFinal Answer: {step['answer'].format(**self.inputs)}"
+
+
+class FakeSearchSchema(BaseModel):
+    search_query: str = Field(..., description="Mandatory search query you want to use to search the internet")
+
+
+class FakeSearchBackend:
+    """Serper stand-in returning recorded results, or generated ones."""
+
+    name = SEARCH_TOOL_NAME
+    description = "A tool that can be used to search the internet with a search_query."
+    args_schema = FakeSearchSchema
+
+    def __init__(self, results, latency):
+        self.results = results
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def run(self, search_query="", **kwargs):
+        with self._lock:
+            self.calls += 1
+        self.latency.sleep()
+        key = normalize_query(search_query)
+        if key in self.results:
+            return self.results[key]
+        slug = "-".join(key.split())[:60]
+        return {
+            "searchParameters": {"q": search_query},
+            "organic": [
+                {"title": f"{search_query} - result {rank}", "link": f"https://example.com/{slug}/{rank}",
+                 "snippet": f"Recorded snippet {rank} for {search_query}."}
+                for rank in range(1, 6)
+            ],
+        }
+
+
+def run_scenario(fixtures, scenario, args, workdir):
+    inputs = {key: scenario[key] for key in ("company_name", "role", "experience", "university_name")}
+    llm_latency = Latency(**fixtures["latency"]["llm"], scale=args.latency_scale, seed=args.seed)
+    search_latency = Latency(**fixtures["latency"]["search"], scale=args.latency_scale, seed=args.seed + 1)
+
+    backend = FakeSearchBackend(fixtures.get("search_results", {}), search_latency)
+    search_cache = PersistentCache(os.path.join(workdir, "search.sqlite3"), table="search_results")
+    search = cached_search_tool(backend, search_cache)
+    llm = ReplayLLM(fixtures["tasks"], inputs, llm_latency)
+    crew = build_crew("replay/offline", api_key="offline", llm=llm, search_tool=search, compact=args.compact_prompts)
+
+    embedder = HashingEmbedder()
+    chunks = chunk_text(fixtures["resume"])
+    resume_index = ResumeIndex("benchmark-resume", chunks, embedder.embed(chunks))
+    task_cache = None
+    if args.task_cache:
+        task_cache = TaskCache(PersistentCache(os.path.join(workdir, "tasks.sqlite3"), table="task_outputs"))
+
+    metrics = RunMetrics(scenario["name"])
+    budget = BudgetTracker()
+    tracemalloc.start()
+    started = time.perf_counter()
+    kickoff_graph(
+        crew,
+        inputs=inputs,
+        max_concurrency=1 if args.sequential else args.concurrency,
+        sequential=args.sequential,
+        task_cache=task_cache,
+        cache_scope={"model": "replay/offline", "resume": resume_index.digest},
+        knowledge=lambda descriptions: resume_index.context_for(descriptions, embedder),
+        metrics=metrics,
+        evidence=EvidenceStore(search) if args.evidence else None,
+        budget=budget,
+    )
+    wall_time = time.perf_counter() - started
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    metrics.budget = budget.report()
+    metrics.prompts = prompt_report(crew)
+    report = metrics.to_dict()
+    report["scenario"] = scenario["name"]
+    report["wall_time"] = wall_time
+    report["peak_traced_memory_mb"] = peak_memory / (1024 * 1024)
+    report["backend_search_calls"] = backend.calls
+    return report
+
+
+def print_report(report):
+    totals = report["totals"]
+    print(f"\n== {report['scenario']}: {report['wall_time']:.2f}s, "
+          f"{totals['llm_calls']} LLM calls, {totals['search_calls']} searches "
+          f"({report['backend_search_calls']} to backend, {totals['evidence_hits']} from evidence), "
+          f"peak traced memory {report['peak_traced_memory_mb']:.1f} MB")
+    prompts = report["prompts"].values()
+    print(f"estimated prompt tokens per step: {sum(p['static'] for p in prompts)} static (persona + tools), "
+          f"{sum(p['task'] for p in prompts)} per-run task text")
+    print(f"{'task':<20}{'wall (s)':>10}{'llm':>6}{'llm (s)':>10}{'search':>8}{'search (s)':>12}{'cached':>8}")
+    for name, task in report["tasks"].items():
+        print(f"{name:<20}{task['wall_time']:>10.2f}{task['llm_calls']:>6}{task['llm_time']:>10.2f}"
+              f"{task['search_calls']:>8}{task['search_time']:>12.2f}{str(task['cached']):>8}")
+
+
+def check_baseline(results, baseline_path, tolerance):
+    """Names of scenarios more than ``tolerance`` slower than the baseline."""
+    with open(baseline_path) as f:
+        baseline = {run["scenario"]: run for run in json.load(f)["runs"]}
+    regressions = []
+    for run in results["runs"]:
+        previous = baseline.get(run["scenario"])
+        if previous and run["wall_time"] > previous["wall_time"] * (1 + tolerance):
+            regressions.append(f"{run['scenario']}: {previous['wall_time']:.2f}s -> {run['wall_time']:.2f}s")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=FIXTURES_PATH)
+    parser.add_argument("--scenario", action="append", help="Run only these scenarios (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--sequential", action="store_true", help="Benchmark Process.sequential semantics")
+    parser.add_argument("--task-cache", action="store_true", help="Enable the task cache (fresh per scenario)")
+    parser.add_argument("--evidence", action="store_true", help="Prefetch shared searches into a per-run evidence store")
+    parser.add_argument("--compact-prompts", action="store_true", help="Trim agent backstories (see prompts.py)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply every injected latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    parser.add_argument("--baseline", help="Fail when slower than the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    with open(args.fixtures) as f:
+        fixtures = json.load(f)
+    scenarios = [s for s in fixtures["scenarios"] if not args.scenario or s["name"] in args.scenario]
+
+    runs = []
+    for scenario in scenarios:
+        with tempfile.TemporaryDirectory() as workdir:
+            report = run_scenario(fixtures, scenario, args, workdir)
+        print_report(report)
+        runs.append(report)
+
+    results = {
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "runs": runs,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        regressions = check_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print("\nSlower than baseline:\n  " + "\n  ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Content-addressed file storage.
+
+Files are stored once under the SHA-256 of their bytes, so uploading the same
+resume again costs nothing and database rows only need to keep the hash.
+"""
+import hashlib
+import os
+import tempfile
+import time
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class LocalBlobStore:
+    """Blob store backed by a directory on the local filesystem.
+
+    Blobs live at ``<root>/<hash[:2]>/<hash><suffix>``.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, digest, suffix=""):
+        return os.path.join(self.root, digest[:2], digest + suffix)
+
+    def exists(self, digest, suffix=""):
+        return os.path.exists(self.path_for(digest, suffix))
+
+    def put_stream(self, fileobj, suffix="", chunk_size=CHUNK_SIZE):
+        """Copy ``fileobj`` into the store chunk by chunk and return its hash.
+
+        The data is written to a temporary file while it is hashed, then moved
+        into place; if a blob with the same hash already exists the copy is
+        dropped.
+        """
+        hasher = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+                    hasher.update(chunk)
+                    tmp.write(chunk)
+
+            digest = hasher.hexdigest()
+            path = self.path_for(digest, suffix)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            return digest
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put_bytes(self, data, suffix=""):
+        """Store ``data`` and return its hash; existing blobs are only touched."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, suffix)
+        if os.path.exists(path):
+            self.touch(digest, suffix)
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest
+
+    def open(self, digest, suffix=""):
+        return open(self.path_for(digest, suffix), "rb")
+
+    def touch(self, digest, suffix=""):
+        # The modification time doubles as the last-used time for evict()
+        os.utime(self.path_for(digest, suffix))
+
+    def evict(self, max_age=None, max_files=None):
+        """Delete blobs unused for ``max_age`` seconds, then the least recently
+        used ones beyond ``max_files``. Returns the number of blobs removed."""
+        blobs = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.startswith(".upload-"):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    blobs.append((os.path.getmtime(path), path))
+                except FileNotFoundError:
+                    continue
+        blobs.sort(reverse=True)
+
+        now = time.time()
+        removed = 0
+        for position, (mtime, path) in enumerate(blobs):
+            expired = max_age is not None and now - mtime > max_age
+            over_cap = max_files is not None and position >= max_files
+            if expired or over_cap:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
@@ -0,0 +1,247 @@
+"""Per-task and per-run budgets for iterations, delegations, wall time and tokens.
+
+Every agent may delegate, so one run could fan out into long delegation
+chains. A task's iterations are capped with crewai's own ``max_iter`` (the
+agent is asked for its final answer when it runs out). The run's iterations
+(LLM calls), delegations, wall time and tokens are tracked by a
+BudgetTracker made current for the run: delegation tools refuse once a task
+has used its share, and the next LLM call of a task over its time or token
+budget, or of a run over its iteration budget, raises BudgetExceeded, which
+dag_executor turns into a partial output built from the steps the agent
+already took.
+
+crewai retries a task whose execution raised (``max_retry_limit``, 2 by
+default). After BudgetExceeded that retry stops at its first LLM call
+without calling the model, since the budget is still spent, so it costs no
+tokens and is not counted as an iteration.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import current_task
+
+TASK_BUDGET = {
+    "max_iter": int(os.getenv("AGENT_MAX_ITER", 10)),
+    "max_delegations": int(os.getenv("AGENT_MAX_DELEGATIONS", 2)),
+    "max_time": int(os.getenv("AGENT_MAX_TIME", 240)),
+    "max_tokens": int(os.getenv("AGENT_MAX_TOKENS", 40000)),
+}
+
+# Synthesis tasks read the other sections and get more room
+TASK_BUDGETS = {
+    "ats_agent": {"max_tokens": 60000},
+    "report_master": {"max_iter": 15, "max_delegations": 3, "max_time": 360, "max_tokens": 100000},
+}
+
+RUN_BUDGET = {
+    "max_iterations": int(os.getenv("RUN_MAX_ITERATIONS", 80)),
+    "max_delegations": int(os.getenv("RUN_MAX_DELEGATIONS", 10)),
+    "max_time": int(os.getenv("RUN_MAX_TIME", 900)),
+    "max_tokens": int(os.getenv("RUN_MAX_TOKENS", 400000)),
+}
+
+# Still run once the run budget is spent, so there is always a final report
+RESERVED_TASKS = {"report_master"}
+
+_current_budget = contextvars.ContextVar("current_budget", default=None)
+
+
+class BudgetExceeded(Exception):
+    """Raised inside a task whose budget, or the run's, has run out."""
+
+    def __init__(self, task_name, reason):
+        super().__init__(f"{task_name}: {reason}")
+        self.task_name = task_name
+        self.reason = reason
+
+
+def current_budget():
+    return _current_budget.get()
+
+
+@contextmanager
+def use_budget(tracker):
+    """Make ``tracker`` the budget of this thread and the threads it starts."""
+    token = _current_budget.set(tracker)
+    tracker.started = time.perf_counter()
+    try:
+        yield tracker
+    finally:
+        _current_budget.reset(token)
+
+
+def _agent_tokens(agent):
+    token_process = getattr(agent, "_token_process", None)
+    return token_process.get_summary().total_tokens if token_process is not None else 0
+
+
+class BudgetTracker:
+    """Usage of one run against TASK_BUDGET/TASK_BUDGETS and RUN_BUDGET."""
+
+    def __init__(self, task_budget=None, task_budgets=None, run_budget=None, reserved=RESERVED_TASKS):
+        self.task_budget = TASK_BUDGET if task_budget is None else task_budget
+        self.task_budgets = TASK_BUDGETS if task_budgets is None else task_budgets
+        self.run_budget = RUN_BUDGET if run_budget is None else run_budget
+        self.reserved = reserved
+        self.started = time.perf_counter()
+        self.agents = []
+        self.tasks = {}
+        self.iterations = 0
+        self._lock = threading.Lock()
+
+    def limits_for(self, task_name):
+        return {**self.task_budget, **self.task_budgets.get(task_name, {})}
+
+    def start_task(self, task_name, agent):
+        """Register a task before it runs and apply its iteration cap to the agent."""
+        limits = self.limits_for(task_name)
+        agent.max_iter = limits["max_iter"]
+        with self._lock:
+            self.tasks[task_name] = {
+                "agent": agent,
+                "limits": limits,
+                "started": time.perf_counter(),
+                "tokens_at_start": _agent_tokens(agent),
+                "iterations": 0,
+                "delegations": 0,
+                "notes": [],
+                "wall_time": None,
+                "exhausted": None,
+            }
+        self.check(task_name)
+
+    def finish_task(self, task_name, exhausted=None):
+        with self._lock:
+            usage = self.tasks[task_name]
+            usage["wall_time"] = time.perf_counter() - usage["started"]
+            usage["exhausted"] = exhausted
+
+    def _task_tokens(self, usage):
+        return _agent_tokens(usage["agent"]) - usage["tokens_at_start"]
+
+    def run_tokens(self):
+        return sum(_agent_tokens(agent) for agent in self.agents)
+
+    def check(self, task_name=None):
+        """Raise BudgetExceeded when the task or the run is over budget."""
+        task_name = task_name or current_task()
+        usage = self.tasks.get(task_name)
+        if usage is None:
+            return
+        limits = usage["limits"]
+        if time.perf_counter() - usage["started"] > limits["max_time"]:
+            raise BudgetExceeded(task_name, f"wall time budget of {limits['max_time']}s used up")
+        if self._task_tokens(usage) > limits["max_tokens"]:
+            raise BudgetExceeded(task_name, f"token budget of {limits['max_tokens']} used up")
+        if task_name in self.reserved:
+            return
+        if time.perf_counter() - self.started > self.run_budget["max_time"]:
+            raise BudgetExceeded(task_name, f"run wall time budget of {self.run_budget['max_time']}s used up")
+        if self.run_tokens() > self.run_budget["max_tokens"]:
+            raise BudgetExceeded(task_name, f"run token budget of {self.run_budget['max_tokens']} used up")
+        if self.iterations >= self.run_budget["max_iterations"]:
+            raise BudgetExceeded(task_name, f"run iteration budget of {self.run_budget['max_iterations']} used up")
+
+    def step(self, task_name=None):
+        """Check the budgets before one LLM call, then count it as an iteration."""
+        task_name = task_name or current_task()
+        self.check(task_name)
+        with self._lock:
+            self.iterations += 1
+            usage = self.tasks.get(task_name)
+            if usage is not None:
+                usage["iterations"] += 1
+
+    def try_delegate(self, task_name=None):
+        """Count one delegation; False when the task or the run has none left."""
+        task_name = task_name or current_task()
+        with self._lock:
+            usage = self.tasks.get(task_name)
+            if usage is None:
+                return True
+            run_delegations = sum(task["delegations"] for task in self.tasks.values())
+            if usage["delegations"] >= usage["limits"]["max_delegations"]:
+                return False
+            if task_name not in self.reserved and run_delegations >= self.run_budget["max_delegations"]:
+                return False
+            usage["delegations"] += 1
+        return True
+
+    def add_note(self, task_name, text):
+        """Keep what a task found so far, for a partial answer."""
+        with self._lock:
+            usage = self.tasks.get(task_name)
+            if usage is not None and text:
+                usage["notes"].append(text)
+
+    def partial_output(self, task_name, reason, max_chars=4000):
+        with self._lock:
+            notes = list(self.tasks.get(task_name, {}).get("notes", []))
+        findings = "\n\n".join(notes)[-max_chars:] or "No findings were collected before the budget ran out."
+        return f"Stopped early ({reason}). Partial findings so far:\n\n{findings}"
+
+    def report(self):
+        """Usage against limits for the run and every task that started."""
+        with self._lock:
+            tasks = {
+                name: {
+                    "wall_time": usage["wall_time"],
+                    "tokens": self._task_tokens(usage),
+                    "iterations": usage["iterations"],
+                    "delegations": usage["delegations"],
+                    "limits": usage["limits"],
+                    "exhausted": usage["exhausted"],
+                }
+                for name, usage in self.tasks.items()
+            }
+        return {
+            "run": {
+                "wall_time": time.perf_counter() - self.started,
+                "tokens": self.run_tokens(),
+                "iterations": self.iterations,
+                "delegations": sum(task["delegations"] for task in tasks.values()),
+                "limits": self.run_budget,
+            },
+            "tasks": tasks,
+        }
+
+
+def guard_llm(llm):
+    """Check and count the current budget before every ``llm.call``; idempotent."""
+    if getattr(llm, "_jobflow_budgeted", False):
+        return llm
+    original_call = llm.call
+
+    def guarded_call(*args, **kwargs):
+        tracker = current_budget()
+        if tracker is not None:
+            tracker.step()
+        return original_call(*args, **kwargs)
+
+    llm.call = guarded_call
+    llm._jobflow_budgeted = True
+    return llm
+
+
+def guard_agent(agent):
+    """Budget-check the agent's LLM and keep its tool results as notes."""
+    if getattr(agent, "_jobflow_budget_callback", None) is not None:
+        return agent
+    original_callback = agent.step_callback
+
+    def step_callback(step):
+        tracker = current_budget()
+        result = getattr(step, "result", None) or getattr(step, "output", None)
+        if tracker is not None and result:
+            tool = getattr(step, "tool", None)
+            tracker.add_note(current_task(), f"{tool}: {result}" if tool else str(result))
+        if original_callback:
+            original_callback(step)
+
+    agent.step_callback = step_callback
+    agent._jobflow_budget_callback = step_callback
+    guard_llm(agent.llm)
+    return agent
@@ -0,0 +1,179 @@
+"""Reusable DB-API connections and a write-behind insert buffer.
+
+Opening a Snowflake connection costs a full handshake, which used to dominate
+every CareerSync form submit. ConnectionPool keeps connections open between
+submits, health-checks them before reuse and reconnects when they have gone
+stale. WriteBehindBuffer collects rows and writes them with a single
+``executemany`` once a size or time threshold is reached.
+
+Only ``cursor``/``execute``/``executemany``/``commit``/``close`` are used, so
+``sqlite3.connect`` works as a local stand-in for ``snowflake.connector``
+(with ``?`` placeholders instead of ``%s``).
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """Thread-safe pool of at most ``max_size`` connections made by ``connect()``."""
+
+    def __init__(self, connect, max_size=4, health_check_after=60.0, acquire_timeout=30.0):
+        self._connect = connect
+        self.health_check_after = health_check_after
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._last_used = {}
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError("No database connection became available")
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._open()
+                if self._is_healthy(conn):
+                    return conn
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, broken=False):
+        if broken:
+            self._discard(conn)
+        else:
+            self._last_used[id(conn)] = time.monotonic()
+            self._idle.put(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            self.release(conn, broken=True)
+            raise
+        else:
+            self.release(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def _open(self):
+        conn = self._connect()
+        self._last_used[id(conn)] = time.monotonic()
+        return conn
+
+    def _is_healthy(self, conn):
+        # Recently used connections are trusted; older ones get a round-trip
+        if time.monotonic() - self._last_used.get(id(conn), 0) < self.health_check_after:
+            return True
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            return True
+        except Exception:
+            logger.info("Dropping stale database connection", exc_info=True)
+            return False
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+    def _discard(self, conn):
+        self._last_used.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class WriteBehindBuffer:
+    """Buffers rows for ``sql`` and flushes them with ``executemany``.
+
+    A flush happens when ``max_rows`` rows are waiting, when the oldest row
+    has waited ``max_delay`` seconds, and at interpreter exit. Rows from a
+    failed flush stay buffered and are retried on the next one.
+    """
+
+    def __init__(self, pool, sql, max_rows=50, max_delay=5.0):
+        self.pool = pool
+        self.sql = sql
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._rows = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._flush_periodically, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add(self, row):
+        with self._lock:
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.append(row)
+            full = len(self._rows) >= self.max_rows
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered row; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+                self._oldest = None
+            if not rows:
+                return 0
+
+            try:
+                with self.pool.connection() as conn:
+                    cursor = conn.cursor()
+                    try:
+                        cursor.executemany(self.sql, rows)
+                        conn.commit()
+                    finally:
+                        cursor.close()
+            except Exception:
+                with self._lock:
+                    self._rows = rows + self._rows
+                    self._oldest = time.monotonic()
+                raise
+            return len(rows)
+
+    def close(self):
+        self._stopped.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Could not flush buffered rows on shutdown")
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(min(1.0, self.max_delay)):
+            with self._lock:
+                due = self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay
+            if due:
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception("Write-behind flush failed; rows will be retried")
@@ -0,0 +1,427 @@
+"""Agent and task definitions for one JobFlowAI analysis.
+
+Importing this module pulls in crewai and langchain, so the app only imports
+it once the first analysis actually runs.
+"""
+from functools import lru_cache
+from crewai import Agent, Task, Crew, Process
+from llm_router import LLMRouter, single_model_router
+from prompts import prepare_agents
+from schemas import (ATSReport, CompanyBrief, HRContacts, JobOpenings, OutreachList, QuestionBank, ReportNarrative,
+                     ReviewSummary)
+from tools import search_tool
+
+
+def build_crew(model, api_key, llm=None, search_tool=search_tool, routing=True, compact=False):
+    """Create the ten agents, their tasks and the Crew that runs them.
+
+    The resume is not attached here; analysis.run_analysis looks up resume
+    excerpts in the persisted resume index and hands them to each task.
+    With ``routing`` each agent runs on its llm_router tier with fallbacks;
+    without it every agent uses ``model``. ``llm`` and ``search_tool`` can be
+    replaced, e.g. by the offline replay doubles in benchmark.py.
+    Agent personas hold no run variables, so their system prompts are the
+    same on every run; ``compact`` also shortens them (see prompts.py).
+    """
+    # Each agent gets the model tier it needs (see llm_router.AGENT_TIERS)
+    router = LLMRouter(api_key) if routing else single_model_router(model, api_key)
+
+    def agent_llm(name):
+        return llm if llm is not None else router.llm_for(name)
+
+    # Iteration, delegation, time and token caps are applied per run from budgets.py
+    JobScout = Agent(
+        name="JobScout",
+        role="Job Opportunity Explorer",
+        goal="Search for and compile a list of current job openings at the target company in India. Provide up-to-date job titles that match the user's target role and experience level."
+            "If none available then provide the career page link for the company."
+            "Give Job Description of the job openings, to ATS_Agent for geting ATS evaluation",
+        backstory="""JobScout is a resourceful assistant designed to help job seekers discover employment opportunities efficiently.\n
+        By leveraging data from platforms like LinkedIn and company career pages, JobScout ensures users have access to the latest job listings.\n
+        JobScout uses search_tool to aggregate job openings, ensuring the information is up-to-date and relevant.\n
+        It provides concise, actionable outputs, including job titles, descriptions, and direct apply links, making the job search process seamless and efficient.\n
+        Additionally, JobScout plays a critical role in enhancing the ATS evaluation process by providing detailed job descriptions to ATS_Agent (Resume Optimizer and ATS Evaluator).\n
+        This collaboration ensures that users can optimize their resumes specifically for the roles they are targeting, increasing their chances of success.\n
+        You are JobScout—a diligent and reliable assistant committed to helping users find the right opportunities and take confident steps toward their career goals.""",
+        allow_delegation=True,
+        tools=[search_tool],
+        verbose=True,
+        llm=agent_llm("JobScout")
+        
+)
+
+    task_job_scout = Task(
+        name="job_scout",
+        description=
+            """Compile a list of current job openings at {company_name} for the {role} position, considering the user's experience level ({experience}) along with links.""",
+        expected_output=
+            """A list of open job roles (e.g., "Software Engineer", "Marketing Manager"), each with its location, a link to apply\n 
+            and the key requirements from its description. The output should be up-to-date and relevant to the user's target role\n 
+            and experience level. Include the company's careers page, especially when no opening matches.""",
+        output_pydantic=JobOpenings,
+        agent=JobScout
+    )
+
+
+####################################################################################################################################
+    ATS_Agent = Agent(
+        name="ATS_Agent",
+        role="Resume Optimizer and ATS Evaluator",
+        goal="""Get Job Descriptions from JobScout Agent.\n
+                Evaluate the user's resume against job descriptions provided by the JobScout agent using a weighted scoring system.\n
+                Assign a relevance score out of 100 based on matches in skills (40%), experience (30%), education (20%), and keywords (10%).\n 
+                Incorporate contextual fit and infer intent from the resume content to provide nuanced feedback. Mimic real-world ATS thresholds (e.g., 80%+ for human review).""",
+        backstory="""ATS_Agent is a cutting-edge AI designed to simulate the functionality of modern Applicant Tracking Systems while adding a layer of contextual intelligence.\n 
+                    Unlike traditional ATS systems that rely solely on keyword matching, ATS_Agent leverages advanced natural language processing to infer intent and context.\n 
+                    For example, phrases like 'collaborated on projects' are interpreted as evidence of teamwork, even if the exact term 'team player' isn't present.\n 
+                    With years of experience in resume parsing and evaluation, ATS_Agent helps users understand how their resume aligns with specific job roles and provides actionable feedback to improve their chances of passing ATS filters.\n 
+                    It uses pdf_source to extract text from resumes and evaluates them against job descriptions using a weighted scoring algorithm.""",
+        allow_delegation=True,
+        tools=[search_tool],
+        verbose=True,
+        llm=agent_llm("ATS_Agent")
+         # Input the resume as a PDF file.
+    )
+
+    task_ats_agent = Task(
+        name="ats_agent",
+        description=
+            """Receive job descriptions from the JobScout agent and analyze the user's resume (provided as a PDF).\n  
+            Perform an ATS evaluation using a weighted scoring system:\n                    
+            - Skills Match: 40%\n
+            - Experience Relevance: 30%\n
+            - Education Alignment: 20%\n
+            - Keyword Presence: 10%\n
+            Infer intent and contextual fit to assign a relevance score out of 100 for each job role. Provide detailed feedback and suggestions for improvement.""",
+        expected_output=
+            """A list of dictionaries containing:\n
+            - job_role: The title of the job role (e.g., "Software Engineer").\n
+            - ats_score: A score out of 100 indicating how well the resume matches the job description.\n
+            - feedback: Detailed feedback on resume strengths, weaknesses, and actionable suggestions for improvement.\n
+            - contextual_fit: A brief explanation of how inferred intent (e.g., teamwork from collaboration) influenced the score.\n
+            The output should help users optimize their resumes for specific job roles and understand the reasoning behind the score and also tell user to apply which position.""",
+        output_pydantic=ATSReport,
+        agent=ATS_Agent,
+        context=[task_job_scout]
+    )
+
+
+    ####################################################################################################################################
+    CompanyInsider = Agent(
+        name="CompanyInsider",
+        role="Corporate Intelligence Analyst",
+        goal="Research recent news, key developments, and essential facts about the target company, including the identity of its CEO."
+            "Provide a conversational summary that users can use in interviews to demonstrate knowledge about the company.",
+        backstory="""CompanyInsider is your trusted guide to understanding the inner workings of any organization.\n
+        Specializing in gathering and synthesizing corporate intelligence, CompanyInsider dives deep into news outlets, press releases, and public announcements to uncover the latest updates about a company.\n
+        With expertise in analyzing trends, achievements, and leadership changes, CompanyInsider ensures users are equipped with the most relevant and up-to-date insights.\n
+        CompanyInsider uses search_tool to gather information from trusted sources, ensuring accuracy and reliability in every report.\n
+        But what truly sets CompanyInsider apart is its ability to transform raw data into natural, human-toned summaries that are easy to understand and engaging to read.\n
+        Whether you’re preparing for an interview, crafting a business strategy, or simply staying informed, CompanyInsider provides the clarity and context you need to make confident decisions.\n
+        You are CompanyInsider—an expert in corporate intelligence with a knack for storytelling.\n
+        Your mission is to empower users with actionable insights, helping them navigate the complex world of modern business with confidence.""",
+        allow_delegation=True,
+        tools=[search_tool],
+        verbose=True,
+        llm=agent_llm("CompanyInsider")
+        
+    )
+
+    task_company_insider = Task(
+        name="company_insider",
+        description=
+            """Research recent news, key developments, and essential facts about {company_name}, including the identity of its CEO.\n
+            Provide a conversational summary for interview preparation.""",
+        expected_output=
+            """A well-crafted, conversational summary of the company’s recent news, developments, and key details, including the CEO’s name.\n 
+            The output should feel authentic when spoken aloud and help users impress interviewers with informed enthusiasm.""",
+        output_pydantic=CompanyBrief,
+        agent=CompanyInsider
+    )
+
+    ####################################################################################################################################
+    ReviewRadar = Agent(
+        name="ReviewRadar",
+        role="Company Reputation Analyst",
+        goal="""Analyze online reviews about a company and summarize key insights, including work-life balance, salary, growth opportunities, and hiring difficulty.\n
+            Your goal is to create a summary of common themes (e.g., work-life balance, salary, growth) and assign a 'Difficulty Score' out of 10 for hiring chances.\n
+            Search online for reviews and analyze them thoroughly.\n
+            Provide a clear summary and justify your Difficulty Score for the target role and experience level.""",
+        backstory="ReviewRadar is an expert in analyzing employee feedback from platforms like Glassdoor and Indeed. "
+            "With years of experience in sentiment analysis and data aggregation, ReviewRadar provides concise summaries "
+            "of company reputations and predicts the difficulty of getting hired based on past candidate experiences."
+            "ReviewRadar uses search_tool to gather reviews from trusted sources and analyze them to provide valuable insights."
+            "You are ReviewRadar, an AI agent tasked with analyzing reviews about the target company.",
+        allow_delegation=True,
+        tools=[search_tool],
+        verbose=True,
+        llm=agent_llm("ReviewRadar")
+        
+    )
+
+    task_review_radar = Task(
+        name="review_radar",
+        description=
+            "Analyze online reviews about {company_name} and summarize key insights, including work-life balance, "
+            "salary, growth opportunities, and hiring difficulty. Assign a 'Difficulty Score' out of 10 based on the reviews "
+            "for the {role} position at the {experience} experience level.",
+        expected_output=
+            """A summary of reviews with clear themes (e.g., work-life balance, salary, growth opportunities) \n
+            and a justified 'Difficulty Score' out of 10 for hiring chances. The output should include both positive \n
+            and negative feedback, along with any notable trends or patterns observed in the reviews.
+            """,
+        output_pydantic=ReviewSummary,
+        agent=ReviewRadar
+    )
+
+    ####################################################################################################################################
+    AlumniConnector = Agent(
+        name="AlumniConnector",
+        role="Networking Facilitator",
+        goal="Locate alumnis from the user's university who are currently employed at the target company. Provide LinkedIn usernames and craft personalized messages for outreach. If alumnis are not available, then provide employees who are likely to give referrals.",
+        backstory="""AlumniConnector is more than just a networking tool—it’s your personal bridge to opportunity.\n
+                    Born out of the belief that shared academic roots create unbreakable bonds, AlumniConnector specializes in uncovering hidden connections within professional networks.\n
+                    With years of experience analyzing LinkedIn profiles and university alumni databases, AlumniConnector has mastered the art of identifying alumni who not only work at your target company but also share common interests, career paths, or even extracurricular activities from their university days.\n
+                    It understands that alumni are often eager to help fellow graduates succeed, making them invaluable resources for mentorship, advice, or referrals.\n
+                    AlumniConnector uses search_tool to find relevant alumni, ensuring it delivers accurate and up-to-date results.\n
+                    But AlumniConnector doesn’t stop at finding names—it crafts thoughtful, personalized messages that resonate with recipients.\n
+                    Whether it’s reminiscing about late-night study sessions in the library or celebrating a shared love for the university football team, these messages are designed to spark genuine conversations and foster meaningful relationships.\n
+                    Equipped with advanced search tools and natural language generation capabilities, AlumniConnector ensures every outreach feels authentic and tailored.\n
+                    Its mission is simple yet powerful: to empower users by connecting them with alumni who can open doors, share insights, and guide them on their professional journey.\n
+                    You are AlumniConnector—an expert networker with a knack for storytelling and relationship-building.\n
+                    Your goal is to transform cold connections into warm introductions, helping users tap into the power of their alma mater’s network.""",
+        allow_delegation=True,
+        tools=[search_tool],
+        verbose=True,
+        llm=agent_llm("AlumniConnector")
+        
+    )
+
+    task_alumni_connector = Task(
+        name="alumni_connector",
+        description=
+            """Find alumnis from {university_name} who are currently employed at {company_name}. Provide LinkedIn usernames and craft personalized messages for outreach.""",
+        expected_output=
+            """A list of dictionaries containing:\n
+            - username: LinkedIn profile URL or username of the alumnus/alumna.\n
+            - message: A personalized message emphasizing the shared university connection.\n
+            The output should foster goodwill and encourage meaningful interactions.""",
+        output_pydantic=OutreachList,
+        agent=AlumniConnector
+    )
+
+
+    ####################################################################################################################################
+    MentorFinder = Agent(
+        name="MentorFinder",
+        role="Mentorship Connector",
+        goal="""Identify experienced professionals within the target company who can act as mentors for the user targeting the role. 
+                Provide LinkedIn usernames and craft personalized messages for outreach based on the user's experience level.""",
+        backstory="""MentorFinder is an expert in networking and mentorship matching, dedicated to helping users find the guidance they need to thrive in their careers.\n
+                With years of experience analyzing professional profiles on platforms like LinkedIn, MentorFinder has honed its ability to identify seasoned professionals who align with users' career goals and aspirations.\n
+                MentorFinder uses search_tool to find relevant mentors, ensuring that each match is based on accurate and up-to-date information.\n
+                But MentorFinder doesn’t stop at identifying potential mentors—it crafts tailored, personalized messages designed to initiate meaningful connections.\n
+                Whether it’s highlighting shared professional interests, mutual connections, or specific achievements, these messages are crafted to resonate with recipients and encourage engagement.\n
+                You are MentorFinder—a trusted companion on the journey to career growth.\n
+                Your mission is to empower users by connecting them with mentors who can provide invaluable advice, support, and inspiration to help them achieve their professional ambitions.""",
+        allow_delegation=True,
+        tools=[search_tool],
+        verbose=True,
+        llm=agent_llm("MentorFinder")
+        
+    )
+
+    task_mentor_finder = Task(
+        name="mentor_finder",
+        description=
+            """Find experienced employees at {company_name} who can mentor the user targeting the {role} position. 
+            Craft personalized messages for outreach based on the user's experience level ({experience}).""",
+        expected_output=
+            """A list of dictionaries containing:
+            - username: LinkedIn profile URL or username of the mentor.
+            - message: A personalized message for the user to send to the mentor.
+            The output should reflect the user's background and goals, ensuring the message is engaging and relevant.""",
+        output_pydantic=OutreachList,
+        agent=MentorFinder
+    )
+
+    ####################################################################################################################################
+    InterviewInsider = Agent(
+        name="InterviewInsider",
+        role="Interview Experience Connector",
+        goal="""Identify individuals who have recently interviewed at the target company for the target role using LinkedIn's search capabilities and craft personalized, natural-sounding messages asking about their interview experience, including details like the types of questions asked, the interview format, and any tips they might share.""",
+        backstory="""InterviewInsider is a master of uncovering valuable insights from those who have walked the path before you. With an uncanny ability to locate professionals who have recently gone through the interview process at top companies, InterviewInsider ensures that users are equipped with the most up-to-date and actionable information to ace their own interviews.\n
+                    Leveraging advanced search tools and deep knowledge of professional networking platforms like LinkedIn, InterviewInsider scours profiles to identify candidates who match the criteria—those who have either been hired or participated in recent interviews for the target role. But InterviewInsider doesn’t stop there; it specializes in crafting warm, conversational, and engaging messages that feel authentic and respectful, encouraging recipients to open up about their experiences.\n
+                    Whether it’s asking about tricky technical questions, behavioral assessments, or even the vibe of the interviewers, InterviewInsider knows how to phrase inquiries in a way that feels natural and fosters genuine connections. By tapping into the collective wisdom of others, InterviewInsider empowers users to step into their interviews fully prepared and confident.\n
+                    You are InterviewInsider, a trusted ally in navigating the often daunting world of job interviews. Your mission is to connect users with firsthand accounts of interview experiences, providing them with the clarity and confidence they need to succeed.""",
+        allow_delegation=True,
+        tools=[search_tool],
+        verbose=True,
+        llm=agent_llm("InterviewInsider")
+        
+    )
+
+    task_interview_insider = Task(
+        name="interview_insider",
+        description=
+            """Use the search_tool to find employees or candidates on LinkedIn who have recently interviewed at {company_name} for the {role} position. Craft personalized, human-toned messages asking about their interview experience, including questions about the types of questions asked, the interview structure, and any advice they might offer.""",
+        expected_output=
+            """A list of dictionaries containing:
+            - username: LinkedIn profile URL or username of the individual.
+            - message: A personalized, natural-sounding message for the user to send, asking about the interview experience.
+            The output should reflect a conversational tone, ensuring the message feels genuine and encourages the recipient to respond with detailed insights.""",
+        output_pydantic=OutreachList,
+        agent=InterviewInsider
+    )
+
+    ####################################################################################################################################
+    InterviewInsight = Agent(
+    name="InterviewInsight",
+    role="Interview Question Specialist",
+    goal="""Collect and categorize technical, HR, and coding questions for the target role at the target company.\n
+            Organize questions into: Technical, HR/Behavioral, Coding Problems (if applicable), and Resume-Based categories.\n
+            Search 2024-2025 sources like Glassdoor, Reddit, LeetCode, and LinkedIn for recent questions.""",
+    backstory=
+        """You are InterviewInsight, the ultimate interview preparation researcher. Your mission is to equip candidates with 
+        the most up-to-date and comprehensive question bank for their target role at the target company. With a razor-sharp focus 
+        on accuracy, you:\n
+        1. **Execute precision searches** using specialized queries like:\n
+        "<role> interview questions <company> (<experience>) site:glassdoor.com"\n
+        "<role> coding round questions <company> site:leetcode.com"\n
+        "<role> behavioral questions <company> site:reddit.com"\n
+        2. **Aggregate from trusted sources** including:\n
+        - Glassdoor (recent interview experiences)\n
+        - Indeed (candidate-reported questions)\n
+        - GeeksforGeeks (technical question banks)\n
+        - LeetCode (coding challenges)\n
+        - LinkedIn (recent interview posts)\n
+        3. **Collaborate with ReviewRadar** to cross-reference company review patterns\n
+        4. **Maintain source transparency** by documenting exact URLs for every question\n
+        5. **Analyze resume-based queries** using the user's provided resume content\n
+        Your work ensures candidates walk into interviews knowing exactly what to expect, from whiteboard coding challenges 
+        to nuanced system design discussions.""",
+    allow_delegation=True,
+    tools=[search_tool],  # Uses SerperDev/ScrapeGhost for multi-site extraction
+    llm=agent_llm("InterviewInsight"),
+    verbose=True
+    
+)
+
+    task_interview_insight = Task(
+        name="interview_insight",
+        description="""Collect and categorize interview questions for {role} at {company_name} ({experience} level).\n
+                    Use specialized search operators across Glassdoor, Indeed, LeetCode, Reddit, and LinkedIn.\n
+                    Include resume-specific questions derived from the user's provided resume content.""",
+        expected_output=
+            """A structured question bank with:\n
+            1. **Technical Questions**: Role-specific technical queries (e.g., system design, domain knowledge)\n
+            2. **HR/Behavioral Questions**: Cultural fit and scenario-based questions\n
+            3. **Coding Problems**: Algorithm challenges and platform-specific problems (LeetCode/GFG)\n
+            4. **Resume-Based Questions**: Queries directly referencing the candidate's work experience\n
+            Each category includes:\n
+            - Source URLs from Glassdoor/LinkedIn/other platforms\n
+            - Question recency (2024-2025)\n
+            - Difficulty ratings where available""",
+        output_pydantic=QuestionBank,
+        agent=InterviewInsight
+    )
+
+    ####################################################################################################################################
+    HRHunter = Agent(
+        name="HRHunter",
+        role="HR Contact Finder",
+        goal="""Locate genuine and verified contact information for HR/recruiters at a specific company.\n
+                Your goal is to locate and verify contact information from trusted sources like LinkedIn profiles,\n
+                company career pages, or official directories. Ensure the contacts are genuine and relevant to the target role in India.\n
+                Provide links or direct contact details where possible, along with a confidence score for authenticity.""",
+        backstory=
+            "You are HRHunter, an AI agent tasked with finding HR/recruiter contact details for the target company in India. "
+            "HRHunter is a skilled investigator who specializes in finding reliable HR contacts. "
+            "Using tools like LinkedIn and company career pages, HRHunter ensures candidates can connect "
+            "with the right people for job applications and interviews."
+            "often HR who works in the company that have email address of the company's domain, you can also find for email address. "
+            "Job openings and referrers are covered by JobScout and MentorFinder, so stick to HR/recruiter contacts. "
+            "search_tool for searching online"
+        ,
+        allow_delegation=True,
+        tools=[search_tool],  # Use SerperDev or similar tool for web scraping.
+        llm=agent_llm("HRHunter"),
+        verbose=True,
+                                
+    )
+
+    task_hr_hunter = Task(
+        name="hr_hunter",
+        description="Locate genuine and verified contact information for HR/recruiters at {company_name}, India, relevant to the {role} position. "
+                    "Search LinkedIn profiles, company career pages, or other official directories for reliable contacts.",
+        expected_output=
+            """A list of verified HR/recruiter contacts, including their names, job titles, and contact details\n 
+            It can be linkedin usernames or email IDs or career site of the {company_name}\n 
+            """,
+        output_pydantic=HRContacts,
+        agent=HRHunter
+    )
+    ####################################################################################################################################
+    ReportMaster = Agent(
+        name="ReportMaster",
+        role="Final Report Compiler",
+        goal="""Give the user a short, honest overview of their prospects for the target role at the target company
+                and the most useful next steps, based on the research of the other agents.
+                The report sections themselves (company overview, reviews, openings, contacts, ATS evaluation,
+                interview questions and sources) are assembled from the other agents' outputs; do not repeat them.""",
+        backstory=
+            """You are ReportMaster, an AI agent tasked with the final word on the user's prospects for the target role.
+            Your inputs include: Summary of Reviews from ReviewRadar, Job Openings from JobScout, Mentorship Opportunities from MentorFinder, 
+            employees who recently interviewd at the company, Alumni Connections from AlumniConnector, ATS Resume Evaluation from ATS_Agent, Interview Questions from InterviewInsight, and HR Contacts from HRHunter.
+            ReportMaster is a meticulous organizer who distills insights from multiple agents into a clear verdict. 
+            With expertise in summarizing complex data, ReportMaster ensures users know where they stand and 
+            what to do next to optimize their chances of success.""",
+        allow_delegation=False,  # Everything it needs is in the other agents' outputs.
+        tools=[],  # No external tools required; relies on outputs from other agents.
+        llm=agent_llm("ReportMaster"),
+        verbose=True
+        
+    )
+
+    task_report_master = Task(
+        name="report_master",
+        description=
+            """Review the outputs of JobScout, ATS_Agent, CompanyInsider, ReviewRadar, AlumniConnector, MentorFinder,
+            InterviewInsider, InterviewInsight and HRHunter for the role of {role} at {company_name}, and write the
+            overview and next steps of the final report.""",
+        expected_output=
+            """An overview of two or three sentences on the user's prospects (best ATS match, hiring difficulty, strongest contacts)\n 
+            and at most five concrete next steps. Keep it short: every other section of the report is generated from the other agents' outputs.""",
+        output_pydantic=ReportNarrative,
+        agent=ReportMaster,
+        context=[task_job_scout, task_ats_agent, task_company_insider, task_review_radar, task_alumni_connector,
+                 task_mentor_finder, task_interview_insider, task_interview_insight, task_hr_hunter]
+    )
+
+    agents = [JobScout,ATS_Agent,CompanyInsider,ReviewRadar,AlumniConnector,MentorFinder,InterviewInsider, InterviewInsight, HRHunter, ReportMaster]  # List of all agents
+    prepare_agents(agents, compact_mode=compact)
+
+    return Crew(
+        agents=agents,
+        tasks=[task_job_scout,task_ats_agent,task_company_insider,task_review_radar,task_alumni_connector, task_mentor_finder,task_interview_insider,task_interview_insight, task_hr_hunter, task_report_master],  # List of all tasks
+        verbose=False,
+        process=Process.sequential
+    )
+
+
+@lru_cache(maxsize=8)
+def get_crew_template(model, api_key, routing=True, compact=False):
+    """The crew for (model, api_key, routing, compact), built once per process.
+
+    Templates keep their {placeholders}; never run one directly.
+    """
+    return build_crew(model, api_key, routing=routing, compact=compact)
+
+
+def new_crew(model, api_key, routing=True, compact=False):
+    """A private copy of the cached crew for one run.
+
+    kickoff interpolates the run's inputs into the tasks and agents in place,
+    so concurrent runs must not share Agent or Task objects.
+    """
+    return get_crew_template(model, api_key, routing, compact).copy()
@@ -0,0 +1,239 @@
+"""Run crew tasks as a dependency graph instead of one after another.
+
+Process.sequential waits for every task before starting the next one, so an
+analysis costs the sum of all LLM and search round-trips. Here the real
+dependencies are read from each task's explicit ``context`` and independent
+tasks run side by side, bounded by ``max_concurrency``. A run then costs
+roughly the longest dependency chain (JobScout -> ATS_Agent -> ReportMaster).
+"""
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+
+from budgets import BudgetExceeded, guard_agent, use_budget
+from evidence import use_evidence
+from metrics import DELEGATION_TOOLS, activate, instrument_agent, record, record_agent_tokens, task_scope
+
+
+def build_dependency_graph(tasks, sequential=False):
+    """Map each task index to the indices of the tasks in its explicit context.
+
+    Tasks without an explicit context list have no dependencies, unless
+    ``sequential`` is set: then they depend on every earlier task, which is
+    what Process.sequential hands them. Raises ValueError when a context task
+    is not part of ``tasks`` or when the dependencies form a cycle.
+    """
+    position = {id(task): index for index, task in enumerate(tasks)}
+    graph = {}
+    for index, task in enumerate(tasks):
+        # Newer crewai versions use a NOT_SPECIFIED sentinel instead of None
+        context = task.context if isinstance(task.context, list) else []
+        if sequential:
+            context = context or tasks[:index]
+        deps = []
+        for dep in context:
+            if id(dep) not in position:
+                raise ValueError(f"Task {index} depends on a task that is not part of the crew")
+            deps.append(position[id(dep)])
+        graph[index] = deps
+
+    _check_acyclic(graph)
+    return graph
+
+
+def _check_acyclic(graph):
+    indegree = {node: len(deps) for node, deps in graph.items()}
+    dependents = {node: [] for node in graph}
+    for node, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(node)
+
+    ready = [node for node, count in indegree.items() if count == 0]
+    visited = 0
+    while ready:
+        node = ready.pop()
+        visited += 1
+        for dependent in dependents[node]:
+            indegree[dependent] -= 1
+            if indegree[dependent] == 0:
+                ready.append(dependent)
+
+    if visited != len(graph):
+        raise ValueError("Task contexts contain a dependency cycle")
+
+
+def run_graph(graph, run_node, max_concurrency=4, on_complete=None):
+    """Execute ``run_node(node, dep_results)`` for every node of ``graph``.
+
+    A node starts as soon as all of its dependencies have finished, with at
+    most ``max_concurrency`` nodes running at once. Nodes that become ready
+    together start in graph order. ``on_complete(node, result)`` is called
+    from the calling thread as each node finishes. The first exception
+    raised by a node cancels everything not yet started and is re-raised.
+    Each node runs in a copy of the caller's context variables.
+    """
+    results = {}
+    pending = dict(graph)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        while pending or running:
+            for node, deps in list(pending.items()):
+                if len(running) >= max_concurrency:
+                    break
+                if all(dep in results for dep in deps):
+                    dep_results = [results[dep] for dep in deps]
+                    context = contextvars.copy_context()
+                    running[pool.submit(context.run, run_node, node, dep_results)] = node
+                    del pending[node]
+
+            if not running:
+                raise ValueError("Graph has nodes whose dependencies can never finish")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    results[node] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+                if on_complete:
+                    on_complete(node, results[node])
+
+    return results
+
+
+def kickoff_graph(crew, inputs, max_concurrency=4, sequential=False, task_cache=None, cache_scope=None,
+                  on_task_complete=None, knowledge=None, metrics=None, evidence=None, budget=None,
+                  history=None, prescorer=None):
+    """Drop-in replacement for ``crew.kickoff(inputs=...)`` using the task graph.
+
+    With ``sequential=True`` and ``max_concurrency=1`` this behaves like
+    Process.sequential. When a ``task_cache`` is given, cacheable tasks whose
+    inputs were seen before are answered from it instead of being executed.
+    ``on_task_complete(task, output)`` is called from the calling thread as
+    soon as each task finishes, so a Streamlit script can render it directly.
+    ``knowledge(descriptions)`` returns extra context for every task in one
+    call, e.g. resume excerpts looked up in a single embedding batch.
+    When ``metrics`` (a metrics.RunMetrics) is given, per-task wall time, LLM
+    and search calls, tokens and delegations are recorded into it.
+    When ``evidence`` (an evidence.EvidenceStore) is given, its shared searches
+    run once before any task, every search of the run goes through it, and
+    the tasks it names get a digest of the results as extra context.
+    When ``budget`` (a budgets.BudgetTracker) is given, a task that runs out
+    of its iteration, delegation, time or token budget, or of the run's,
+    returns a partial output instead of failing the run; the usage is
+    available from ``budget.report()`` afterwards.
+    When ``history`` (a snapshots.IncrementalRun) is given, each task gets
+    ``history.context_for(task)`` as extra context when it starts and its
+    output is passed to ``history.record(task, output)`` when it finishes.
+    When ``prescorer`` (an ats_scorer.ATSPreScorer) is given, a task for which
+    ``prescorer.context_for(task, dep_outputs)`` returns text gets that text
+    instead of its dependencies' outputs.
+
+    Each agent should own a single task: crewai agents keep per-call executor
+    state, so one agent must not run two tasks at the same time. Delegating
+    runs the coworker agent itself, which may be busy with its own task, so
+    with ``max_concurrency`` above 1 the delegation tools are withheld.
+    """
+    from crewai.crews.crew_output import CrewOutput
+    from crewai.tasks.task_output import TaskOutput
+    from crewai.utilities.formatter import aggregate_raw_outputs_from_task_outputs
+
+    from tools import budgeted_delegation_tool
+
+    crew._interpolate_inputs(inputs)
+    for agent in crew.agents:
+        agent.crew = crew
+        if budget is not None:
+            guard_agent(agent)
+        if metrics is not None:
+            instrument_agent(agent)
+
+    if budget is not None:
+        budget.agents = crew.agents
+
+    tasks = crew.tasks
+    graph = build_dependency_graph(tasks, sequential=sequential)
+    extra_context = knowledge([task.description for task in tasks]) if knowledge else [""] * len(tasks)
+    evidence_context = [""] * len(tasks)
+
+    def run_task(index, dep_outputs):
+        task = tasks[index]
+        with task_scope(task.name, task.agent.role):
+            cache_key = None
+            if task_cache is not None:
+                cache_key = task_cache.key_for(task, inputs, dep_outputs, cache_scope or {})
+                if cache_key is not None:
+                    cached = task_cache.get(cache_key, task.output_pydantic)
+                    if cached is not None:
+                        record(cached=True)
+                        task.output = cached
+                        return cached
+
+            replaced = prescorer.context_for(task, dep_outputs) if prescorer is not None else None
+            context = replaced if replaced is not None else aggregate_raw_outputs_from_task_outputs(dep_outputs)
+            if extra_context[index]:
+                context = f"{context}\n\nAdditional Information: {extra_context[index]}".strip()
+            if evidence_context[index]:
+                context = f"{context}\n\n{evidence_context[index]}".strip()
+            history_context = history.context_for(task) if history is not None else ""
+            if history_context:
+                # Told to skip what is already known, so the output is not a full answer to cache
+                cache_key = None
+                context = f"{context}\n\n{history_context}".strip()
+            tools = crew._prepare_tools(task.agent, task, list(task.tools or task.agent.tools or []))
+            if max_concurrency > 1:
+                tools = [tool for tool in tools if tool.name.strip().lower() not in DELEGATION_TOOLS]
+            if budget is None:
+                output = task.execute_sync(agent=task.agent, context=context, tools=tools)
+            else:
+                tools = [budgeted_delegation_tool(tool, budget) if tool.name.strip().lower() in DELEGATION_TOOLS
+                         else tool for tool in tools]
+                try:
+                    budget.start_task(task.name, task.agent)
+                    output = task.execute_sync(agent=task.agent, context=context, tools=tools)
+                except BudgetExceeded as error:
+                    # Partial outputs are handed on to dependents but never cached
+                    budget.finish_task(task.name, exhausted=error.reason)
+                    record(budget_stops=1)
+                    record_agent_tokens(task.name, task.agent)
+                    task.output = TaskOutput(
+                        name=task.name,
+                        description=task.description,
+                        expected_output=task.expected_output,
+                        raw=budget.partial_output(task.name, error.reason),
+                        agent=task.agent.role,
+                    )
+                    return task.output
+                budget.finish_task(task.name)
+            record_agent_tokens(task.name, task.agent)
+            if cache_key is not None:
+                task_cache.set(cache_key, task, output)
+            return output
+
+    def task_completed(index, output):
+        if history is not None:
+            history.record(tasks[index], output)
+        if on_task_complete:
+            on_task_complete(tasks[index], output)
+
+    with activate(metrics) if metrics is not None else nullcontext(), \
+            use_evidence(evidence) if evidence is not None else nullcontext(), \
+            use_budget(budget) if budget is not None else nullcontext():
+        if evidence is not None:
+            with task_scope("evidence_prefetch"):
+                evidence.prefetch(inputs)
+            evidence_context = [evidence.context_for(task) for task in tasks]
+        outputs = run_graph(graph, run_task, max_concurrency=max_concurrency, on_complete=task_completed)
+    tasks_output = [outputs[index] for index in range(len(tasks))]
+    final_output = tasks_output[-1]
+
+    return CrewOutput(
+        raw=final_output.raw,
+        pydantic=final_output.pydantic,
+        json_dict=final_output.json_dict,
+        tasks_output=tasks_output,
+        token_usage=crew.calculate_usage_metrics(),
+    )
@@ -0,0 +1,148 @@
+"""Per-run evidence store shared by all agents of one analysis.
+
+JobScout, HRHunter, AlumniConnector, MentorFinder and InterviewInsider all
+search LinkedIn and the company's pages for the same company. The store runs
+a handful of shared queries once at the start of the run, keeps every search
+result indexed by normalized query and by entity (company, university), and
+hands a compact digest to the agents that need it. While a store is active,
+the search tool answers repeated queries from it before going to the
+persistent cache or the network.
+"""
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Searches most of the LinkedIn/company-page agents would otherwise each run
+SHARED_QUERIES = [
+    "{company_name} careers {role} jobs India",
+    "{company_name} HR recruiter talent acquisition India LinkedIn",
+    "{company_name} {role} employees LinkedIn",
+    "{university_name} alumni working at {company_name} LinkedIn",
+]
+
+# Tasks that receive the digest of the shared evidence as context
+EVIDENCE_TASKS = {"job_scout", "hr_hunter", "alumni_connector", "mentor_finder", "interview_insider"}
+
+_current_evidence = contextvars.ContextVar("current_evidence", default=None)
+
+
+def current_evidence():
+    return _current_evidence.get()
+
+
+@contextmanager
+def use_evidence(store):
+    """Make ``store`` the evidence store for this thread and threads it starts."""
+    token = _current_evidence.set(store)
+    try:
+        yield store
+    finally:
+        _current_evidence.reset(token)
+
+
+def _result_items(result):
+    # Serper returns a dict with "organic" results; older tool versions return text
+    if isinstance(result, dict):
+        return result.get("organic") or []
+    return [{"snippet": str(result)}]
+
+
+class EvidenceStore:
+    """Search results of one run, indexed by normalized query and entity.
+
+    Keys are normalized queries (see tools.normalize_query); the search tool
+    adds every result it returns while the store is current.
+    """
+
+    def __init__(self, search_tool=None, queries=SHARED_QUERIES, task_names=EVIDENCE_TASKS, max_workers=4):
+        self.search_tool = search_tool
+        self.queries = queries
+        self.task_names = task_names
+        self.max_workers = max_workers
+        self.entities = []
+        self._results = {}
+        self._by_entity = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._results.get(key)
+        return None if entry is None else entry["result"]
+
+    def add(self, key, query, result):
+        with self._lock:
+            if key in self._results:
+                return
+            self._results[key] = {"query": query, "result": result}
+            for entity in self.entities:
+                if entity.lower() in key:
+                    self._by_entity.setdefault(entity, []).append(key)
+
+    def prefetch(self, inputs):
+        """Run the shared queries for ``inputs`` concurrently, once per run.
+
+        A query that fails (no API key, rate limited after retries, ...) is
+        logged and skipped; the agents can still search for themselves.
+        """
+        self.entities = [value for value in (inputs.get("company_name"), inputs.get("university_name")) if value]
+        if self.search_tool is None:
+            return
+        queries = []
+        for template in self.queries:
+            try:
+                queries.append(template.format(**inputs))
+            except KeyError:
+                continue
+
+        def fetch(query):
+            with use_evidence(self):
+                try:
+                    self.search_tool.run(search_query=query)
+                except Exception:
+                    logger.warning("Shared search %r failed; continuing without it", query, exc_info=True)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, fetch, query) for query in queries]
+            for future in futures:
+                future.result()
+
+    def entries_for(self, entity):
+        with self._lock:
+            return [self._results[key] for key in self._by_entity.get(entity, [])]
+
+    def digest(self, entity=None, max_items=25, max_snippet=200):
+        """Titles, links and snippets collected (about ``entity``), deduplicated by link."""
+        lines = []
+        seen_links = set()
+        if entity is not None:
+            entries = self.entries_for(entity)
+        else:
+            with self._lock:
+                entries = list(self._results.values())
+        for entry in entries:
+            for item in _result_items(entry["result"]):
+                link = item.get("link")
+                if link in seen_links:
+                    continue
+                seen_links.add(link)
+                snippet = (item.get("snippet") or "")[:max_snippet]
+                title = item.get("title") or entry["query"]
+                lines.append(f"- {title}" + (f" ({link})" if link else "") + (f": {snippet}" if snippet else ""))
+                if len(lines) >= max_items:
+                    break
+            if len(lines) >= max_items:
+                break
+        return "\n".join(lines)
+
+    def context_for(self, task):
+        if task.name not in self.task_names:
+            return ""
+        digest = self.digest(self.entities[0] if self.entities else None)
+        if not digest:
+            return ""
+        return ("Search results already collected for this run (check these before searching again; "
+                "repeating one of these searches returns the same results):\n" + digest)
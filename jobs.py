@@ -0,0 +1,207 @@
+"""Background job queue for crew runs.
+
+Streamlit reruns the whole script on every interaction, so a crew started
+inside the script is lost on refresh. Jobs run on a bounded worker pool
+instead; their status, per-task outputs and final result are persisted in
+SQLite so any session can reattach to a job by its ID.
+"""
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from admission import get_admission_queue
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+INTERRUPTED = "interrupted"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+# Parameters that are handed to the worker but never written to disk
+SECRET_PARAMS = {"api_key"}
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """Persists job status, per-task events and results in SQLite."""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.host = socket.gethostname()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                host TEXT NOT NULL,
+                pid INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS job_events (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                task_name TEXT,
+                title TEXT,
+                raw TEXT,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def create(self, params, job_id=None):
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, params, host, pid, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(params), self.host, os.getpid(), now, now),
+            )
+            self._conn.commit()
+        return job_id
+
+    def update(self, job_id, status, result=None, error=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = COALESCE(?, result), error = COALESCE(?, error), updated_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def add_event(self, job_id, task_name, title, raw):
+        with self._lock:
+            seq = self._conn.execute(
+                "SELECT COUNT(*) FROM job_events WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            self._conn.execute(
+                "INSERT INTO job_events (job_id, seq, task_name, title, raw, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, seq, task_name, title, raw, time.time()),
+            )
+            self._conn.commit()
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        return job
+
+    def events(self, job_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_name, title, raw, created_at FROM job_events WHERE job_id = ? ORDER BY seq", (job_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def mark_interrupted(self):
+        """Flag active jobs whose owning process on this host has died."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, pid FROM jobs WHERE host = ? AND status IN ({', '.join('?' for _ in ACTIVE_STATUSES)})",
+                (self.host, *ACTIVE_STATUSES),
+            ).fetchall()
+            for row in rows:
+                if row["pid"] == os.getpid() or not _pid_alive(row["pid"]):
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                        (INTERRUPTED, "The server restarted before this job finished.", time.time(), row["id"]),
+                    )
+            self._conn.commit()
+
+
+class JobManager:
+    """Runs ``run_fn(params, on_task_complete=..., run_id=job_id)`` on a bounded thread pool.
+
+    Jobs wait in an admission.AdmissionQueue and only reach the pool when
+    the global, per-user and per-API-key limits allow, so the pool itself
+    never queues. Managers share the process-wide queue by default, so
+    single analyses and batches count against the same limits; whenever any
+    of them submits or finishes a job, the next ready job is started by the
+    manager that queued it.
+    """
+
+    def __init__(self, store, run_fn, admission=None):
+        self.store = store
+        self.run_fn = run_fn
+        self.admission = admission or get_admission_queue()
+        self._pool = ThreadPoolExecutor(max_workers=self.admission.max_running, thread_name_prefix="crew-job")
+        store.mark_interrupted()
+
+    def submit(self, params, user=None, weight=1):
+        """Queue a run and return its job ID.
+
+        ``user`` identifies who submitted it for the per-user limits; the API
+        key in ``params`` is only kept as a hash for the per-key limits.
+        ``weight`` is how many crews the run executes at once.
+        Raises admission.Overloaded when the job is shed.
+        """
+        job_id = uuid.uuid4().hex
+        api_key = params.get("api_key")
+        key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16] if api_key else None
+        with self.admission.submit_lock:
+            # Shed before anything is written, so a refused job leaves no trace
+            self.admission.enqueue(job_id, user or key_hash or job_id, key_hash, weight=weight,
+                                   payload=(self, params))
+            self.store.create({key: value for key, value in params.items() if key not in SECRET_PARAMS}, job_id=job_id)
+        self._dispatch()
+        return job_id
+
+    def queue_position(self, job_id):
+        """``(jobs_ahead, eta_seconds)`` while ``job_id`` waits in this process, else None."""
+        return self.admission.position(job_id)
+
+    def _dispatch(self):
+        while True:
+            with self.admission.submit_lock:
+                ready = self.admission.next_ready()
+            if ready is None:
+                return
+            job_id, _, _, (manager, params) = ready
+            manager._pool.submit(manager._run, job_id, params)
+
+    def _run(self, job_id, params):
+        self.store.update(job_id, RUNNING)
+        started = time.monotonic()
+
+        def on_task_complete(task, output, title=None):
+            self.store.add_event(job_id, task.name, title or task.agent.role, output.raw)
+
+        try:
+            result = self.run_fn(params, on_task_complete=on_task_complete, run_id=job_id)
+        except Exception as e:
+            self.store.update(job_id, FAILED, error=str(e))
+            self.admission.finish(job_id)
+        else:
+            self.store.update(job_id, SUCCEEDED, result=str(getattr(result, "raw", result)))
+            self.admission.finish(job_id, run_time=time.monotonic() - started)
+        self._dispatch()
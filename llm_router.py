@@ -0,0 +1,122 @@
+"""Per-agent LLM routing with a fast tier, a strong tier and fallbacks.
+
+Extraction-style agents (HRHunter, AlumniConnector, ...) run on the cheap,
+low-latency tier; synthesis agents (ATS_Agent, ReportMaster) on the strong
+one. Every tier has its own temperature, max_tokens and timeout, and a call
+that times out or errors is retried on the next tier in FALLBACK_TIERS, so a
+stuck request can no longer hang the whole run.
+"""
+import logging
+import os
+
+from crewai import LLM
+
+from metrics import record
+
+logger = logging.getLogger(__name__)
+
+LLM_TIERS = {
+    "fast": {
+        "model": os.getenv("LLM_FAST_MODEL", "gemini/gemini-2.0-flash-lite"),
+        "temperature": 0.3,
+        "max_tokens": 2048,
+        "timeout": 60,
+    },
+    "strong": {
+        "model": os.getenv("LLM_STRONG_MODEL", "gemini/gemini-2.0-flash"),
+        "temperature": 0.5,
+        "max_tokens": 8192,
+        "timeout": 180,
+    },
+}
+
+AGENT_TIERS = {
+    "JobScout": "fast",
+    "CompanyInsider": "fast",
+    "ReviewRadar": "fast",
+    "AlumniConnector": "fast",
+    "MentorFinder": "fast",
+    "InterviewInsider": "fast",
+    "InterviewInsight": "fast",
+    "HRHunter": "fast",
+    "ATS_Agent": "strong",
+    "ReportMaster": "strong",
+}
+
+# Tiers to try, in order, after a tier's call fails or times out
+FALLBACK_TIERS = {
+    "fast": ["strong"],
+    "strong": ["fast"],
+}
+
+
+class RoutedLLM(LLM):
+    """Calls each candidate LLM in turn until one returns.
+
+    The crewai LLM fields (model, context window) are those of the first
+    candidate. crewai's executor sets the ReAct stop words on the agent's llm,
+    i.e. on this object, so they are copied to each candidate before it is
+    called. Candidates only need a ``call`` method, so stubs work.
+    """
+
+    def __init__(self, candidates):
+        primary = candidates[0]
+        super().__init__(
+            model=primary.model,
+            temperature=getattr(primary, "temperature", None),
+            max_tokens=getattr(primary, "max_tokens", None),
+            timeout=getattr(primary, "timeout", None),
+        )
+        self.candidates = candidates
+
+    def call(self, *args, **kwargs):
+        for position, candidate in enumerate(self.candidates):
+            # Every agent uses the same ReAct stop words, so sharing candidates across threads is safe
+            candidate.stop = self.stop
+            try:
+                return candidate.call(*args, **kwargs)
+            except Exception:
+                if position == len(self.candidates) - 1:
+                    raise
+                logger.warning("LLM call to %s failed; falling back to %s",
+                               candidate.model, self.candidates[position + 1].model, exc_info=True)
+                record(llm_fallbacks=1)
+
+
+class LLMRouter:
+    """Hands out one RoutedLLM per tier, shared by all agents on that tier."""
+
+    def __init__(self, api_key, tiers=None, agent_tiers=None, fallbacks=None, default_tier="strong"):
+        self.api_key = api_key
+        self.tiers = LLM_TIERS if tiers is None else tiers
+        self.agent_tiers = AGENT_TIERS if agent_tiers is None else agent_tiers
+        self.fallbacks = FALLBACK_TIERS if fallbacks is None else fallbacks
+        self.default_tier = default_tier
+        self._clients = {}
+        self._routed = {}
+
+    def tier_for(self, agent_name):
+        return self.agent_tiers.get(agent_name, self.default_tier)
+
+    def llm_for(self, agent_name):
+        tier = self.tier_for(agent_name)
+        if tier not in self._routed:
+            chain = [tier] + [name for name in self.fallbacks.get(tier, []) if name != tier]
+            self._routed[tier] = RoutedLLM([self._client(name) for name in chain])
+        return self._routed[tier]
+
+    def _client(self, tier):
+        if tier not in self._clients:
+            self._clients[tier] = LLM(api_key=self.api_key, **self.tiers[tier])
+        return self._clients[tier]
+
+
+def single_model_router(model, api_key, timeout=120):
+    """Every agent on ``model`` with the old settings, but with a timeout."""
+    return LLMRouter(
+        api_key,
+        tiers={"default": {"model": model, "temperature": 0.5, "timeout": timeout}},
+        agent_tiers={},
+        fallbacks={},
+        default_tier="default",
+    )
@@ -0,0 +1,398 @@
+"""Scheduled matcher that turns JOB_PREFERENCES rows into job-opening notifications.
+
+The CareerSync form stores keywords, location, job type, experience level,
+salary range and e-mail in JOB_PREFERENCES. Every ``--interval`` seconds this
+worker streams the table, groups subscribers by (keyword, location, job type,
+experience level) so each distinct search runs once no matter how many
+people share it, keeps only postings a group has not been sent before, drops
+postings whose advertised pay is outside a subscriber's salary range, and
+queues one digest e-mail per subscriber. Queued e-mails are then handed to
+the mailer. Searches bypass the 24 h search cache, so every pass sees
+current postings.
+
+    python matcher.py                        # Snowflake, Serper and SMTP, every MATCHER_INTERVAL seconds
+    python matcher.py --fake --seed 20000 --once
+                                             # local SQLite, fake search, e-mails to data/outbox.jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import smtplib
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+MATCHER_INTERVAL = int(os.getenv("MATCHER_INTERVAL", 6 * 3600))
+MATCHER_SEARCH_WORKERS = int(os.getenv("MATCHER_SEARCH_WORKERS", 8))
+MATCHER_DB_PATH = os.getenv("MATCHER_DB_PATH", os.path.join("data", "matcher.sqlite3"))
+MAX_POSTINGS_PER_EMAIL = 20
+FETCH_SIZE = 5000
+
+SELECT_JOB_PREFERENCES = """
+    SELECT keywords, location, job_type, experience_level, salary_range, notify_email
+    FROM JOB_PREFERENCES
+"""
+
+SEARCH_QUERY = "{keyword} {experience_level} {job_type} job openings {location}"
+
+# "$95,000", "120000", "95k", "₹12,00,000", "12 LPA", "10-15 lakhs", "1.5 Cr"; a
+# range shares its unit. Bare figures below 1000 are not salaries
+_SALARY_AMOUNT = r"\d{1,3}(?:,\d{2,3})+|\d+(?:\.\d+)?"
+_SALARY_PATTERN = re.compile(
+    rf"({_SALARY_AMOUNT})(?:\s*(?:-|–|to)\s*({_SALARY_AMOUNT}))?\s*(k|lpa|lakhs?|lacs?|crores?|cr)?\b", re.I)
+_SALARY_UNITS = {"k": 1_000, "lpa": 100_000, "lakh": 100_000, "lac": 100_000, "crore": 10_000_000, "cr": 10_000_000}
+
+
+def normalize(text):
+    return re.sub(r"\s+", " ", str(text or "")).strip().lower()
+
+
+def iter_preferences(conn, fetch_size=FETCH_SIZE):
+    """Stream preference rows from a DB-API connection, ``fetch_size`` at a time."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SELECT_JOB_PREFERENCES)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for keywords, location, job_type, experience_level, salary_range, email in rows:
+                try:
+                    keywords = json.loads(keywords) if isinstance(keywords, str) else keywords
+                except ValueError:
+                    keywords = keywords.split(",")
+                yield {
+                    "keywords": [keyword for keyword in (keywords or []) if normalize(keyword)],
+                    "location": location,
+                    "job_type": job_type,
+                    "experience_level": experience_level,
+                    "salary_range": salary_range,
+                    "email": email,
+                }
+    finally:
+        cursor.close()
+
+
+def group_preferences(preferences):
+    """Map each normalized (keyword, location, job_type, experience_level) to its subscribers.
+
+    Subscribers are an ``{email: salary_range}`` dict. A subscriber with three
+    keywords joins three groups, and subscribers who submitted the form
+    several times are merged by e-mail (the latest salary range wins), so the
+    number of searches grows with distinct interests rather than with rows.
+    """
+    groups = {}
+    for preference in preferences:
+        email = normalize(preference["email"])
+        if not email:
+            continue
+        filters = (normalize(preference["location"]), normalize(preference.get("job_type")),
+                   normalize(preference.get("experience_level")))
+        for keyword in preference["keywords"]:
+            groups.setdefault((normalize(keyword), *filters), {})[email] = preference.get("salary_range")
+    return groups
+
+
+def search_query(group_key):
+    keyword, location, job_type, experience_level = group_key
+    query = SEARCH_QUERY.format(keyword=keyword, location=location, job_type=job_type,
+                                experience_level=experience_level)
+    return " ".join(query.split())
+
+
+def salary_amounts(text):
+    amounts = []
+    for low, high, unit in _SALARY_PATTERN.findall(str(text or "")):
+        multiplier = _SALARY_UNITS[unit.lower().rstrip("s")] if unit else 1
+        for figure in filter(None, (low, high)):
+            if unit or "," in figure or ("." not in figure and len(figure) >= 4):
+                amounts.append(round(float(figure.replace(",", "")) * multiplier))
+    return amounts
+
+
+def parse_salary_range(text):
+    """``(low, high)`` from "90000-120000", "90k - 120k" or "10-15 LPA", or None when there is no range."""
+    amounts = salary_amounts(text)
+    if not amounts:
+        return None
+    return min(amounts), max(amounts)
+
+
+def salary_matches(posting, salary_range):
+    """False only when the posting names pay and every figure is outside ``salary_range``."""
+    bounds = parse_salary_range(salary_range)
+    if bounds is None:
+        return True
+    amounts = salary_amounts(f"{posting.get('title', '')} {posting.get('snippet', '')}")
+    # Four-digit numbers in postings are mostly years
+    amounts = [amount for amount in amounts if not 1900 <= amount <= 2100]
+    return not amounts or any(bounds[0] <= amount <= bounds[1] for amount in amounts)
+
+
+def result_postings(result):
+    """Title/link/snippet dicts from a search result (Serper dict or text)."""
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            return []
+    postings = []
+    for item in (result or {}).get("organic") or []:
+        if item.get("link"):
+            postings.append({key: item.get(key, "") for key in ("title", "link", "snippet")})
+    return postings
+
+
+class MatcherStore:
+    """Postings already sent per group, and the queue of e-mails to send."""
+
+    def __init__(self, path=MATCHER_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS seen_postings (
+                group_key TEXT NOT NULL,
+                link TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                PRIMARY KEY (group_key, link)
+            );
+            CREATE TABLE IF NOT EXISTS notifications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                body TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                sent_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS notifications_pending ON notifications (sent_at);
+            """
+        )
+        self._conn.commit()
+
+    def keep_unseen(self, group_key, postings):
+        """Record ``postings`` for the group and return the ones it had not seen."""
+        now = time.time()
+        unseen = []
+        with self._lock:
+            for posting in postings:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO seen_postings (group_key, link, first_seen) VALUES (?, ?, ?)",
+                    (group_key, posting["link"], now),
+                )
+                if cursor.rowcount:
+                    unseen.append(posting)
+            self._conn.commit()
+        return unseen
+
+    def enqueue(self, notifications):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO notifications (email, subject, body, created_at) VALUES (?, ?, ?, ?)",
+                [(email, subject, body, now) for email, subject, body in notifications],
+            )
+            self._conn.commit()
+
+    def pending(self, limit=500):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, email, subject, body FROM notifications WHERE sent_at IS NULL ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def mark_sent(self, ids):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE notifications SET sent_at = ? WHERE id = ?", [(time.time(), id_) for id_ in ids]
+            )
+            self._conn.commit()
+
+
+class SmtpMailer:
+    """Sends through SMTP_HOST/SMTP_PORT with optional SMTP_USER/SMTP_PASSWORD."""
+
+    def __init__(self):
+        self.host = os.environ["SMTP_HOST"]
+        self.port = int(os.getenv("SMTP_PORT", 587))
+        self.user = os.getenv("SMTP_USER")
+        self.password = os.getenv("SMTP_PASSWORD")
+        self.sender = os.getenv("SMTP_FROM", self.user or "jobflowai@localhost")
+
+    def send(self, messages):
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password)
+            for email, subject, body in messages:
+                message = EmailMessage()
+                message["From"] = self.sender
+                message["To"] = email
+                message["Subject"] = subject
+                message.set_content(body)
+                smtp.send_message(message)
+
+
+class OutboxMailer:
+    """Local stand-in for SmtpMailer that appends e-mails to a JSON-lines file."""
+
+    def __init__(self, path=os.path.join("data", "outbox.jsonl")):
+        self.path = path
+
+    def send(self, messages):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as f:
+            for email, subject, body in messages:
+                f.write(json.dumps({"to": email, "subject": subject, "body": body}) + "\n")
+
+
+def digest_email(email, matches):
+    """Subject and body listing the new postings of every group ``email`` is in."""
+    lines = []
+    count = 0
+    for group_key, postings in matches:
+        if count >= MAX_POSTINGS_PER_EMAIL:
+            break
+        keyword, location = group_key[:2]
+        lines.append(f"{keyword}" + (f" in {location}" if location else "") + ":")
+        for posting in postings[:MAX_POSTINGS_PER_EMAIL - count]:
+            lines.append(f"  - {posting['title']}\n    {posting['link']}")
+            count += 1
+        lines.append("")
+    subject = f"JobFlowAI: {count} new job opening{'s' if count != 1 else ''} for you"
+    return email, subject, "\n".join(lines)
+
+
+def run_once(conn, search, store, mailer, workers=MATCHER_SEARCH_WORKERS):
+    """One matching pass; returns how many groups were searched and e-mails sent."""
+    groups = group_preferences(iter_preferences(conn))
+
+    def search_group(group_key):
+        query = search_query(group_key)
+        try:
+            postings = result_postings(search.run(search_query=query))
+        except Exception:
+            logger.warning("Search for %r failed; retrying next pass", query, exc_info=True)
+            return group_key, []
+        return group_key, store.keep_unseen("|".join(group_key), postings)
+
+    per_email = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="matcher-search") as pool:
+        for group_key, unseen in pool.map(search_group, list(groups)):
+            for email, salary_range in groups[group_key].items():
+                postings = [posting for posting in unseen if salary_matches(posting, salary_range)]
+                if postings:
+                    per_email.setdefault(email, []).append((group_key, postings))
+
+    store.enqueue([digest_email(email, matches) for email, matches in per_email.items()])
+    sent = send_pending(store, mailer)
+    return {"groups": len(groups), "notified": len(per_email), "sent": sent}
+
+
+def send_pending(store, mailer, batch_size=500):
+    """Send queued e-mails; ones that fail stay queued for the next pass."""
+    sent = 0
+    while True:
+        rows = store.pending(batch_size)
+        if not rows:
+            return sent
+        try:
+            mailer.send([(email, subject, body) for _, email, subject, body in rows])
+        except Exception:
+            logger.warning("Sending notifications failed; they stay queued", exc_info=True)
+            return sent
+        store.mark_sent([row[0] for row in rows])
+        sent += len(rows)
+
+
+def connect_snowflake():
+    import snowflake.connector
+
+    return snowflake.connector.connect(
+        user=os.environ['user'],
+        password=os.environ["password"],
+        account=os.environ["account"],
+        warehouse=os.environ["warehouse"],
+        database=os.environ["database"],
+        schema=os.environ["schema"]
+    )
+
+
+def connect_fake_preferences(path, seed=0):
+    """SQLite stand-in for Snowflake, optionally filled with ``seed`` generated rows."""
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS JOB_PREFERENCES (
+            keywords TEXT, location TEXT, job_type TEXT, experience_level TEXT,
+            salary_range TEXT, notify_email TEXT, resume_hash TEXT
+        )"""
+    )
+    if seed:
+        keywords = ["Data Scientist", "ML Engineer", "Backend Developer", "Product Manager",
+                    "Data Analyst", "DevOps Engineer", "Frontend Developer", "QA Engineer"]
+        locations = ["Remote", "Bangalore", "Pune", "Hyderabad", "Mumbai"]
+        conn.executemany(
+            "INSERT INTO JOB_PREFERENCES VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (json.dumps([keywords[i % 8], keywords[(i * 3 + 1) % 8]]), locations[i % 5], "Full-time",
+                 "Entry", "", f"user{i}@example.com", None)
+                for i in range(seed)
+            ],
+        )
+    conn.commit()
+    return conn
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interval", type=int, default=MATCHER_INTERVAL, help="Seconds between passes")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+    parser.add_argument("--fake", action="store_true", help="Use local SQLite, fake search and an outbox file")
+    parser.add_argument("--fake-db", default=os.path.join("data", "fake_preferences.sqlite3"))
+    parser.add_argument("--seed", type=int, default=0, help="With --fake, add this many generated preference rows")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    store = MatcherStore()
+    # Searches go straight to the backend: the shared search cache keeps results for a
+    # day, longer than a pass interval, and each pass already searches a group only once
+    if args.fake:
+        from benchmark import FakeSearchBackend, Latency
+
+        connect_fake_preferences(args.fake_db, args.seed).close()
+        connect = partial(connect_fake_preferences, args.fake_db)
+        search = FakeSearchBackend({}, Latency(0.05, 0.02))
+        mailer = OutboxMailer()
+    else:
+        from search_client import SerperSearchClient
+
+        connect, search, mailer = connect_snowflake, SerperSearchClient(), SmtpMailer()
+
+    while True:
+        started = time.perf_counter()
+        conn = connect()
+        try:
+            counts = run_once(conn, search, store, mailer)
+        finally:
+            conn.close()
+        logger.info("Matched %(groups)d groups, notified %(notified)d subscribers, sent %(sent)d e-mails", counts)
+        logger.info("Pass took %.1fs", time.perf_counter() - started)
+        if args.once:
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
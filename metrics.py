@@ -0,0 +1,223 @@
+"""Per-run instrumentation: wall time, LLM and search calls, tokens, delegations.
+
+A RunMetrics object is made current for the duration of a run (see
+``activate``) and every worker thread started by dag_executor inherits it,
+together with the name of the task it is executing. The search tool and the
+wrapped agent LLMs record into whatever run and task are current, so nothing
+has to be threaded through crewai itself.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join("data", "metrics"))
+
+# Set PROMETHEUS_TEXTFILE to a node_exporter textfile-collector path to export there
+PROMETHEUS_TEXTFILE = os.getenv("PROMETHEUS_TEXTFILE")
+
+DELEGATION_TOOLS = ("delegate work to coworker", "ask question to coworker")
+
+_current_run = contextvars.ContextVar("current_run", default=None)
+_current_task = contextvars.ContextVar("current_task", default=None)
+
+
+def _empty_task():
+    return {
+        "agent": None,
+        "wall_time": 0.0,
+        "cached": False,
+        "llm_calls": 0,
+        "llm_time": 0.0,
+        "llm_fallbacks": 0,
+        "search_calls": 0,
+        "search_time": 0.0,
+        "search_cache_hits": 0,
+        "evidence_hits": 0,
+        "steps": 0,
+        "delegations": 0,
+        "budget_stops": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+    }
+
+
+class RunMetrics:
+    """Thread-safe counters for one analysis, grouped by task name."""
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.started_at = time.time()
+        self.wall_time = 0.0
+        self.tasks = {}
+        self.budget = None
+        self.prompts = None
+        self._lock = threading.Lock()
+
+    def add(self, task_name, **values):
+        with self._lock:
+            task = self.tasks.setdefault(task_name or "unattributed", _empty_task())
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    task[key] += value
+                else:
+                    task[key] = value
+
+    def totals(self):
+        with self._lock:
+            totals = _empty_task()
+            for task in self.tasks.values():
+                for key, value in task.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        totals[key] += value
+        totals.pop("agent")
+        totals.pop("cached")
+        totals["wall_time"] = self.wall_time
+        return totals
+
+    def to_dict(self):
+        with self._lock:
+            tasks = {name: dict(values) for name, values in self.tasks.items()}
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "wall_time": self.wall_time,
+            "tasks": tasks,
+            "totals": self.totals(),
+            "budget": self.budget,
+            "prompts": self.prompts,
+        }
+
+    def save(self, directory=METRICS_DIR):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.run_id}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def to_prometheus(self):
+        """The run in Prometheus text exposition format, one series per task."""
+        lines = []
+        data = self.to_dict()
+        for key in _empty_task():
+            if key in ("agent", "cached"):
+                continue
+            metric = f"jobflow_task_{key}"
+            lines.append(f"# TYPE {metric} gauge")
+            for name, values in data["tasks"].items():
+                lines.append(f'{metric}{{run_id="{self.run_id}",task="{name}"}} {values[key]}')
+        lines.append("# TYPE jobflow_run_wall_time gauge")
+        lines.append(f'jobflow_run_wall_time{{run_id="{self.run_id}"}} {self.wall_time}')
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        """Write the JSON report and, when configured, the Prometheus textfile."""
+        self.save()
+        if PROMETHEUS_TEXTFILE:
+            tmp_path = f"{PROMETHEUS_TEXTFILE}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, PROMETHEUS_TEXTFILE)
+
+
+def load_run_metrics(run_id, directory=METRICS_DIR):
+    path = os.path.join(directory, f"{run_id}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def current_run():
+    return _current_run.get()
+
+
+def current_task():
+    return _current_task.get()
+
+
+@contextmanager
+def activate(metrics):
+    """Make ``metrics`` the current run for this thread and threads it starts."""
+    token = _current_run.set(metrics)
+    started = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics.wall_time = time.perf_counter() - started
+        _current_run.reset(token)
+
+
+@contextmanager
+def task_scope(task_name, agent=None):
+    """Attribute everything recorded inside the block to ``task_name``."""
+    token = _current_task.set(task_name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current_run.get()
+        if metrics is not None:
+            metrics.add(task_name, agent=agent, wall_time=time.perf_counter() - started)
+        _current_task.reset(token)
+
+
+def record(**values):
+    """Add ``values`` to the current task of the current run, if any."""
+    metrics = _current_run.get()
+    if metrics is not None:
+        metrics.add(_current_task.get(), **values)
+
+
+def instrument_llm(llm):
+    """Time every ``llm.call``; wrapping the same object twice is a no-op."""
+    if getattr(llm, "_jobflow_instrumented", False):
+        return llm
+    original_call = llm.call
+
+    def timed_call(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return original_call(*args, **kwargs)
+        finally:
+            record(llm_calls=1, llm_time=time.perf_counter() - started)
+
+    llm.call = timed_call
+    llm._jobflow_instrumented = True
+    return llm
+
+
+def instrument_agent(agent):
+    """Count agent steps and delegations through the agent's step_callback."""
+    if getattr(agent, "_jobflow_step_callback", None) is not None:
+        return agent
+    original_callback = agent.step_callback
+
+    def step_callback(step):
+        tool = (getattr(step, "tool", None) or "").strip().lower()
+        record(steps=1, delegations=1 if tool in DELEGATION_TOOLS else 0)
+        if original_callback:
+            original_callback(step)
+
+    agent.step_callback = step_callback
+    agent._jobflow_step_callback = step_callback
+    instrument_llm(agent.llm)
+    return agent
+
+
+def record_agent_tokens(task_name, agent):
+    """Copy the agent's token usage into the run; each agent owns one task."""
+    metrics = _current_run.get()
+    token_process = getattr(agent, "_token_process", None)
+    if metrics is None or token_process is None:
+        return
+    usage = token_process.get_summary()
+    metrics.add(
+        task_name,
+        prompt_tokens=usage.prompt_tokens,
+        completion_tokens=usage.completion_tokens,
+        total_tokens=usage.total_tokens,
+    )
@@ -2,6 +2,19 @@ import streamlit as st
 import snowflake.connector
 import json
 import os
+from connection_pool import ConnectionPool, WriteBehindBuffer
+from analysis import save_resume
+from resume_parser import get_parser
+
+# Rows keep only the resume's content hash; the file itself lives in the shared resume store
+INSERT_JOB_PREFERENCE = """
+    INSERT INTO JOB_PREFERENCES
+    (keywords, location, job_type, experience_level, salary_range, notify_email, resume_hash)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+# Set PREFERENCES_WRITE_BEHIND=1 to batch inserts instead of writing on every submit
+WRITE_BEHIND = os.getenv("PREFERENCES_WRITE_BEHIND") == "1"
 
 # Connect to Snowflake using secrets
 def get_snowflake_connection():
@@ -16,28 +29,47 @@ def get_snowflake_connection():
     )
     return conn
 
+# Connections are shared across submits and sessions instead of reconnecting every time
+@st.cache_resource
+def get_connection_pool():
+    return ConnectionPool(get_snowflake_connection, max_size=int(os.getenv("SNOWFLAKE_POOL_SIZE", 4)))
+
+@st.cache_resource
+def get_preference_buffer():
+    return WriteBehindBuffer(
+        get_connection_pool(),
+        INSERT_JOB_PREFERENCE,
+        max_rows=int(os.getenv("PREFERENCES_FLUSH_ROWS", 50)),
+        max_delay=float(os.getenv("PREFERENCES_FLUSH_SECONDS", 5)),
+    )
+
 # Insert user data into Snowflake
-def insert_job_preference(conn, keywords, location, job_type, experience_level, salary_range, notify_email, resume_binary):
-    cursor = conn.cursor()
+def insert_job_preference(pool, keywords, location, job_type, experience_level, salary_range, notify_email, resume_hash):
+    # Convert keywords list to JSON string for storing
+    keywords_json = json.dumps(keywords)
+    row = (keywords_json, location, job_type, experience_level, salary_range, notify_email, resume_hash)
+
     try:
-        # Convert keywords list to JSON string for storing
-        keywords_json = json.dumps(keywords)
-
-        insert_query = """
-            INSERT INTO JOB_PREFERENCES
-            (keywords, location, job_type, experience_level, salary_range, notify_email, resume)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(insert_query, (keywords_json, location, job_type, experience_level, salary_range, notify_email, resume_binary))
-        conn.commit()
+        if WRITE_BEHIND:
+            get_preference_buffer().add(row)
+            return True
+
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(INSERT_JOB_PREFERENCE, row)
+                conn.commit()
+            finally:
+                cursor.close()
         return True
     except Exception as e:
         st.error(f"Error inserting data: {e}")
         return False
-    finally:
-        cursor.close()
 
 # Streamlit UI starts here
+if 'careersync_resume_hash' not in st.session_state:
+    st.session_state.careersync_resume_hash = None
+
 st.title("CareerSync - Job Preferences Form")
 
 with st.form("job_prefs_form"):
@@ -60,15 +92,26 @@ if submitted:
     else:
         keywords_list = [k.strip() for k in keywords_input.split(",") if k.strip()]
 
-        resume_bytes = None
+        resume_hash = None
+        success = False
         if resume_file:
-            resume_bytes = resume_file.read()
+            # Streamed into the durable resume store, which also starts parsing it
+            try:
+                resume_hash = save_resume(resume_file, keep=True)
+            except ValueError as e:
+                st.error(str(e))
         else:
             st.warning("No resume uploaded; the resume field will be empty.")
 
-        conn = get_snowflake_connection()
-        success = insert_job_preference(conn, keywords_list, location, job_type, experience_level, salary_range, notify_email, resume_bytes)
-        conn.close()
+        if resume_hash or not resume_file:
+            success = insert_job_preference(get_connection_pool(), keywords_list, location, job_type, experience_level, salary_range, notify_email, resume_hash)
 
         if success:
             st.success("Your job preferences have been saved successfully!")
+            st.session_state.careersync_resume_hash = resume_hash
+
+# Parsing finishes in the background; the skills appear on a later rerun
+if st.session_state.careersync_resume_hash:
+    parsed = get_parser().cached(st.session_state.careersync_resume_hash)
+    if parsed and parsed["skills"]:
+        st.caption(f"Skills found in your resume: {', '.join(parsed['skills'][:15])}")
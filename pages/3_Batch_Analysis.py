@@ -0,0 +1,133 @@
+import sys
+import pysqlite3
+
+sys.modules["sqlite3"] = pysqlite3
+
+import streamlit as st
+import os
+import hashlib
+from admission import Overloaded
+from sessions import client_id
+from analysis import save_resume
+from batch import BATCH_ITEM_EVENT, MAX_BATCH_ITEMS, read_targets, run_batch
+from jobs import JobManager, JobStore, ACTIVE_STATUSES, SUCCEEDED
+
+
+# Batches are stored apart but admitted through the same queue as single analyses
+@st.cache_resource
+def get_batch_manager():
+    store = JobStore(os.path.join("data", "batch_jobs.sqlite3"))
+    return JobManager(store, run_batch)
+
+
+batch_manager = get_batch_manager()
+# A batch takes one admission slot per company it analyzes at once
+max_batch_concurrency = batch_manager.admission.max_running
+
+if 'batch_job_id' not in st.session_state:
+    st.session_state.batch_job_id = st.query_params.get("batch")
+if 'batch_resume_hash' not in st.session_state:
+    st.session_state.batch_resume_hash = None
+client_id()
+
+st.title("📚 Batch Analysis")
+st.markdown(
+    "Analyze one resume against several companies or roles at once. Upload a CSV with "
+    f"`company_name`, `role` and `experience` columns (at most {MAX_BATCH_ITEMS} rows)."
+)
+
+with st.sidebar:
+    model = st.selectbox("Select Model", ["gemini/gemini-2.0-flash-lite"])
+    use_routing = st.checkbox("Route agents to fast/strong models", value=True)
+    batch_concurrency = st.slider("Companies analyzed at once", min_value=1,
+                                  max_value=max(2, min(5, max_batch_concurrency)), value=2)
+    batch_concurrency = min(batch_concurrency, max_batch_concurrency)
+    max_concurrency = st.slider("Max parallel agents per company", min_value=1, max_value=9, value=4)
+    api_key = st.text_input("Enter API Key", type="password")
+
+
+def show_batch(job_id):
+    job = batch_manager.store.get(job_id)
+    # Only the browser that started a batch can follow it
+    if job is None or job["params"].get("client_id") != client_id():
+        st.warning("This batch could not be found.")
+        return
+
+    events = batch_manager.store.events(job_id)
+    if job["status"] in ACTIVE_STATUSES:
+        total = len(job["params"].get("targets", []))
+        queued = batch_manager.queue_position(job_id)
+        if queued:
+            ahead, eta = queued
+            st.info(f"⏳ Batch queued: {ahead} ahead of you, starting in about {max(1, round(eta / 60))} min.")
+        else:
+            st.info(f"🔄 Batch {job['status']}... {len(events)}/{total} companies done.")
+        for event in events:
+            if event["task_name"] == BATCH_ITEM_EVENT:
+                with st.expander(f"✅ {event['title']}"):
+                    st.markdown(event["raw"])
+    elif job["status"] == SUCCEEDED:
+        st.markdown(job["result"])
+        st.download_button("Download comparison", job["result"], file_name=f"batch-{job_id}.md")
+    else:
+        st.error(f"The batch did not finish ({job['status']}): {job['error']}")
+
+
+def batch_active(job_id):
+    job = batch_manager.store.get(job_id)
+    return job is not None and job["status"] in ACTIVE_STATUSES
+
+
+# Refreshes only while the batch is queued or running, then hands over to a static show_batch
+@st.fragment(run_every="3s")
+def poll_batch(job_id):
+    show_batch(job_id)
+    if not batch_active(job_id):
+        st.rerun()
+
+
+with st.form("batch_form"):
+    resume_file = st.file_uploader("Resume (PDF or DOCX)", type=["pdf", "docx"])
+    targets_file = st.file_uploader("Targets (CSV)", type=["csv"])
+    university_name = st.text_input("University Name")
+    submitted = st.form_submit_button("Start Batch")
+
+if submitted:
+    if not api_key:
+        st.warning("Please enter your API key in the sidebar.")
+    elif not resume_file or not targets_file:
+        st.warning("Please upload both a resume and a targets CSV.")
+    else:
+        try:
+            targets = read_targets(targets_file.getvalue())
+        except ValueError as e:
+            st.error(f"Could not read the CSV: {e}")
+        else:
+            resume_bytes = resume_file.getvalue()
+            try:
+                if hashlib.sha256(resume_bytes).hexdigest() != st.session_state.batch_resume_hash:
+                    st.session_state.batch_resume_hash = save_resume(resume_bytes)
+                job_id = batch_manager.submit({
+                    "targets": targets,
+                    "university_name": university_name,
+                    "model": model,
+                    "api_key": api_key,
+                    "resume_hash": st.session_state.batch_resume_hash,
+                    "execution_mode": "Parallel",
+                    "max_concurrency": max_concurrency,
+                    "use_task_cache": True,
+                    "routing": use_routing,
+                    "batch_concurrency": batch_concurrency,
+                    "client_id": client_id()
+                }, user=client_id(), weight=min(batch_concurrency, len(targets)))
+            except (Overloaded, ValueError) as e:
+                st.error(str(e))
+            else:
+                st.session_state.batch_job_id = job_id
+                st.query_params["batch"] = job_id
+
+if st.session_state.batch_job_id:
+    if batch_active(st.session_state.batch_job_id):
+        poll_batch(st.session_state.batch_job_id)
+    else:
+        show_batch(st.session_state.batch_job_id)
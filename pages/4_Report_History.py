@@ -0,0 +1,79 @@
+import sys
+import pysqlite3
+
+sys.modules["sqlite3"] = pysqlite3
+
+import streamlit as st
+import time
+from report_store import EXPORT_FORMATS, ReportStore
+from sessions import client_id
+
+PAGE_SIZE = 20
+
+
+# The index is shared by every session; artifacts are only read when opened
+@st.cache_resource
+def get_report_store():
+    return ReportStore()
+
+
+report_store = get_report_store()
+
+if 'history_limit' not in st.session_state:
+    st.session_state.history_limit = PAGE_SIZE
+# Only this client's reports are listed; others open with their share token
+owner = client_id()
+
+st.title("🗂️ Report History")
+
+
+def show_exports(run_id, share_token):
+    cols = st.columns(len(EXPORT_FORMATS))
+    for col, (fmt, mime) in zip(cols, EXPORT_FORMATS.items()):
+        try:
+            data = report_store.export(run_id, fmt, owner=owner, share_token=share_token)
+        except Exception:
+            # e.g. fpdf2 missing or unable to lay out the report; offer the other formats
+            continue
+        col.download_button(f"Download {fmt.upper()}", data, file_name=f"report-{run_id}.{fmt}", mime=mime,
+                            key=f"export-{run_id}-{fmt}")
+
+
+run_id = st.query_params.get("report")
+if run_id:
+    share_token = st.query_params.get("share")
+    artifact = report_store.load(run_id, owner=owner, share_token=share_token)
+    if artifact is None:
+        st.warning("This report could not be found.")
+    else:
+        inputs = artifact["inputs"]
+        st.caption(f"{inputs.get('role')} at {inputs.get('company_name')} · "
+                   f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(artifact['created_at']))}")
+        own_token = report_store.share_token(run_id, owner)
+        if own_token is not None:
+            st.caption("Share this report:")
+            st.code(f"Report_History?report={run_id}&share={own_token}", language=None)
+        show_exports(run_id, share_token)
+        st.markdown(artifact["markdown"])
+    if st.button("← All reports"):
+        del st.query_params["report"]
+        st.query_params.pop("share", None)
+        st.rerun()
+    st.stop()
+
+search = st.text_input("Filter by company or role")
+rows = report_store.list(owner, limit=st.session_state.history_limit, search=search or None)
+if not rows:
+    st.info("No saved reports yet. Finished analyses show up here.")
+
+for row in rows:
+    col1, col2 = st.columns([4, 1])
+    col1.markdown(f"**{row['role']}** at **{row['company_name']}**  \n"
+                  f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(row['created_at']))}")
+    if col2.button("Open", key=f"open-{row['run_id']}"):
+        st.query_params["report"] = row["run_id"]
+        st.rerun()
+
+if len(rows) == st.session_state.history_limit and st.button("Load more"):
+    st.session_state.history_limit += PAGE_SIZE
+    st.rerun()
@@ -0,0 +1,89 @@
+"""Agent persona hygiene: static personas, compact mode and prompt token counts.
+
+crewai puts an agent's role, goal and backstory into the system prompt of
+every LLM call, ahead of the task and its context. When those strings hold
+{company_name}/{role}/{experience}, the prefix differs per run and
+provider-side prompt caching never hits; run variables therefore belong in
+the task descriptions only, and ``prepare_agents`` rejects personas that
+contain them. In compact mode (PROMPT_MODE=compact or the app's checkbox)
+whitespace is collapsed and each backstory is cut, at sentence boundaries,
+to PERSONA_TOKEN_BUDGET tokens. ``prompt_report`` estimates the prompt
+tokens of every agent, split into the static (cacheable) and per-run parts.
+"""
+import os
+import re
+
+PROMPT_MODE = os.getenv("PROMPT_MODE", "full")
+PERSONA_TOKEN_BUDGET = int(os.getenv("PERSONA_TOKEN_BUDGET", 120))
+
+PERSONA_FIELDS = ("role", "goal", "backstory")
+
+_PLACEHOLDER_PATTERN = re.compile(r"\{[a-z_]+\}")
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text):
+    # About four characters per token for English prose; close enough to compare prompts
+    return (len(text or "") + 3) // 4
+
+
+def collapse_whitespace(text):
+    # Backstories are indented triple-quoted strings with explicit line breaks
+    return " ".join((text or "").split())
+
+
+def compact(text, budget=PERSONA_TOKEN_BUDGET):
+    """``text`` without redundant whitespace, cut to whole sentences within ``budget`` tokens."""
+    text = collapse_whitespace(text)
+    if estimate_tokens(text) <= budget:
+        return text
+    kept = []
+    for sentence in _SENTENCE_PATTERN.split(text):
+        if estimate_tokens(" ".join(kept + [sentence])) > budget:
+            break
+        kept.append(sentence)
+    if kept:
+        return " ".join(kept)
+    # A single sentence longer than the budget is cut at a word boundary
+    return text[:budget * 4].rsplit(" ", 1)[0]
+
+
+def prepare_agents(agents, compact_mode=False, budget=PERSONA_TOKEN_BUDGET):
+    """Check that personas are static and, in compact mode, shorten them in place.
+
+    Raises ValueError naming the agent and field that holds a run variable.
+    """
+    for agent in agents:
+        for field in PERSONA_FIELDS:
+            found = _PLACEHOLDER_PATTERN.search(getattr(agent, field) or "")
+            if found:
+                raise ValueError(f"{agent.role}: {field} contains {found.group(0)}; "
+                                 f"run variables belong in the task description")
+        if compact_mode:
+            agent.goal = collapse_whitespace(agent.goal)
+            agent.backstory = compact(agent.backstory, budget)
+    return agents
+
+
+def prompt_report(crew):
+    """Estimated prompt tokens per agent, keyed by the name of the task it owns.
+
+    ``persona`` and ``tools`` make up the static system prompt that
+    provider caching can reuse across runs; ``task`` is the per-run task
+    description and expected output, before any dependency context.
+    """
+    report = {}
+    for task in crew.tasks:
+        agent = task.agent
+        persona = sum(estimate_tokens(getattr(agent, field)) for field in PERSONA_FIELDS)
+        tools = sum(estimate_tokens(tool.description) for tool in agent.tools or [])
+        task_tokens = estimate_tokens(task.description) + estimate_tokens(task.expected_output)
+        report[task.name] = {
+            "agent": agent.role,
+            "persona": persona,
+            "tools": tools,
+            "task": task_tokens,
+            "static": persona + tools,
+            "total": persona + tools + task_tokens,
+        }
+    return report
@@ -0,0 +1,184 @@
+"""Render structured task outputs as markdown and assemble the final report.
+
+ReportMaster only writes a short narrative (schemas.ReportNarrative); every
+other section is rendered here from the other agents' typed outputs, so the
+final step no longer re-reads and rewrites nine long texts. Outputs that are
+not valid JSON for their schema (e.g. an agent that ignored the format, or a
+partial answer after a budget stop) are shown as the agent wrote them.
+"""
+import json
+import re
+
+from schemas import TASK_SCHEMAS
+
+# Report sections in order, with the task each one is rendered from
+REPORT_SECTIONS = [
+    ("Company Overview", "company_insider"),
+    ("Review Summary", "review_radar"),
+    ("Job Opportunities", "job_scout"),
+    ("Mentorship Connections", "mentor_finder"),
+    ("Employees to Reach Out To", "interview_insider"),
+    ("Alumni Networking", "alumni_connector"),
+    ("ATS Resume Evaluation", "ats_agent"),
+    ("Interview Preparation", "interview_insight"),
+    ("HR Contacts", "hr_hunter"),
+]
+
+NARRATIVE_TASK = "report_master"
+
+_URL_PATTERN = re.compile(r"https?://[^\s)\]>\"'<]+")
+# A bare domain, optionally with a path: "linkedin.com/in/jane", "www.example.co.uk"
+_DOMAIN_PATTERN = re.compile(r"^(?:[\w-]+\.)+[a-z]{2,}(?:[/?#]\S*)?$", re.I)
+
+
+def structured(task_name, output):
+    """The task's schema instance from a TaskOutput or raw JSON text, or None."""
+    model = TASK_SCHEMAS.get(task_name)
+    if model is None or output is None:
+        return None
+    if isinstance(getattr(output, "pydantic", None), model):
+        return output.pydantic
+    raw = getattr(output, "raw", output)
+    try:
+        return model.model_validate_json(raw)
+    except ValueError:
+        # Agents sometimes wrap the JSON in prose or a code fence
+        match = re.search(r"\{.*\}", raw or "", re.S)
+        if match:
+            try:
+                return model.model_validate_json(match.group(0))
+            except ValueError:
+                pass
+    return None
+
+
+def _link(label, url):
+    """A markdown link for URL- or domain-shaped ``url``; handles, emails and phone numbers stay text."""
+    if not url:
+        return label
+    if url.startswith(("http://", "https://")):
+        return f"[{label}]({url})"
+    if _DOMAIN_PATTERN.match(url.lstrip("/")):
+        return f"[{label}](https://{url.lstrip('/')})"
+    return label if label == url else f"{label} ({url})"
+
+
+def _render_openings(data):
+    lines = [f"- {_link(opening.title, opening.url)}" + (f" · {opening.location}" if opening.location else "")
+             + (f"\n  {opening.description}" if opening.description else "") for opening in data.openings]
+    if data.careers_page:
+        lines.append(f"- Careers page: {_link(data.careers_page, data.careers_page)}")
+    return "\n".join(lines) or "No matching openings found."
+
+
+def _render_ats(data):
+    if not data.evaluations:
+        return "No evaluations."
+    lines = ["| Role | ATS score | Feedback |", "| --- | --- | --- |"]
+    for evaluation in sorted(data.evaluations, key=lambda e: -e.ats_score):
+        feedback = " ".join(f"{evaluation.feedback} {evaluation.contextual_fit}".split()).replace("|", "/")
+        lines.append(f"| {evaluation.job_role} | {evaluation.ats_score}/100 | {feedback} |")
+    return "\n".join(lines)
+
+
+def _render_company(data):
+    lines = [data.summary]
+    if data.ceo:
+        lines.append(f"\n**CEO:** {data.ceo}")
+    return "\n".join(lines)
+
+
+def _render_reviews(data):
+    lines = [f"**Difficulty score:** {data.difficulty_score}/10" + (f" — {data.difficulty_reason}" if data.difficulty_reason else ""), ""]
+    lines += [f"- **{theme.theme}:** {theme.summary}" for theme in data.themes]
+    return "\n".join(lines)
+
+
+def _render_outreach(data):
+    lines = [f"- {_link(contact.username, contact.username)}\n  > {contact.message}" for contact in data.contacts]
+    return "\n".join(lines) or "No contacts found."
+
+
+_QUESTION_CATEGORIES = {"technical": "Technical Questions", "hr": "HR/Behavioral Questions", "coding": "Coding Problems",
+                        "resume": "Resume-Based Questions"}
+
+
+def _render_questions(data):
+    lines = []
+    found = {question.category.strip().lower() for question in data.questions}
+    for category in [name for name in _QUESTION_CATEGORIES if name in found] + sorted(found - set(_QUESTION_CATEGORIES)):
+        lines.append(f"**{_QUESTION_CATEGORIES.get(category, category.title())}**")
+        for question in data.questions:
+            if question.category.strip().lower() == category:
+                lines.append(f"- {question.question}" + (f" ([source]({question.source_url}))" if question.source_url else ""))
+        lines.append("")
+    return "\n".join(lines).strip() or "No questions found."
+
+
+def _render_hr(data):
+    lines = [f"- {contact.name}" + (f", {contact.title}" if contact.title else "")
+             + f" — {_link(contact.contact, contact.contact)} (confidence {contact.confidence:.0%})"
+             for contact in data.contacts]
+    return "\n".join(lines) or "No verified contacts found."
+
+
+_RENDERERS = {
+    "job_scout": _render_openings,
+    "ats_agent": _render_ats,
+    "company_insider": _render_company,
+    "review_radar": _render_reviews,
+    "alumni_connector": _render_outreach,
+    "mentor_finder": _render_outreach,
+    "interview_insider": _render_outreach,
+    "interview_insight": _render_questions,
+    "hr_hunter": _render_hr,
+}
+
+
+def render_task(task_name, output):
+    """Markdown for one task's output (a TaskOutput or its raw text)."""
+    data = structured(task_name, output)
+    if data is None or task_name not in _RENDERERS:
+        return getattr(output, "raw", output) or ""
+    return _RENDERERS[task_name](data)
+
+
+def collect_sources(outputs):
+    """Every distinct URL mentioned by the task outputs, in order of appearance."""
+    sources = []
+    for output in outputs.values():
+        data = getattr(output, "pydantic", None)
+        text = json.dumps(data.model_dump()) if data is not None else getattr(output, "raw", "")
+        for url in _URL_PATTERN.findall(text or ""):
+            url = url.rstrip(".,;")
+            if url not in sources:
+                sources.append(url)
+    return sources
+
+
+def assemble_report(inputs, tasks_output, changes=""):
+    """The final markdown report from every task's output, keyed by task name.
+
+    ``changes`` is an optional markdown section (see
+    snapshots.IncrementalRun.changes_section) placed after the overview.
+    """
+    outputs = {output.name: output for output in tasks_output if output.name}
+    narrative = structured(NARRATIVE_TASK, outputs.get(NARRATIVE_TASK))
+
+    lines = [f"# {inputs['role']} at {inputs['company_name']}", ""]
+    if narrative is not None:
+        lines += [narrative.overview, ""]
+    elif outputs.get(NARRATIVE_TASK) is not None:
+        lines += [outputs[NARRATIVE_TASK].raw, ""]
+    if changes:
+        lines += [changes, ""]
+    # Numbered as rendered, so a missing section leaves no gap
+    present = [(title, task_name) for title, task_name in REPORT_SECTIONS if task_name in outputs]
+    for number, (title, task_name) in enumerate(present, start=1):
+        lines += [f"## {number}. {title}", "", render_task(task_name, outputs[task_name]), ""]
+    if narrative is not None and narrative.next_steps:
+        lines += ["## Next Steps", ""] + [f"{step_number}. {step}" for step_number, step in enumerate(narrative.next_steps, start=1)] + [""]
+    sources = collect_sources({name: output for name, output in outputs.items() if name != NARRATIVE_TASK})
+    if sources:
+        lines += ["## Sources", ""] + [f"- {url}" for url in sources]
+    return "\n".join(lines).strip()
@@ -0,0 +1,212 @@
+"""Durable, compressed report artifacts keyed by run ID, with Markdown/HTML/PDF export.
+
+Every finished analysis is written once as a gzip-compressed JSON artifact
+(the assembled report, the inputs and each task's typed output) plus a row
+in a small SQLite index used by the history page. Re-opening, exporting or
+sharing a past report is then a disk read instead of a new crew run.
+Artifacts carry ARTIFACT_VERSION; older versions are upgraded when loaded.
+
+Reports hold resume-based evaluations, so each one belongs to the client
+that ran it (see sessions.client_id): ``list`` only shows a client its own
+reports, and ``load``/``export`` also need that owner or the report's
+random share token. Reports saved without an owner are only reachable by
+share token.
+"""
+import gzip
+import hmac
+import html
+import json
+import os
+import re
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from functools import lru_cache
+
+REPORTS_DIR = os.getenv("REPORTS_DIR", os.path.join("data", "reports"))
+ARTIFACT_VERSION = 2
+EXPORT_FORMATS = {
+    "md": "text/markdown",
+    "html": "text/html",
+    "pdf": "application/pdf",
+}
+
+
+def _task_entry(output):
+    data = getattr(output, "pydantic", None)
+    return {"raw": output.raw, "structured": data.model_dump() if data is not None else None}
+
+
+class ReportStore:
+    """Artifacts at ``<root>/<run_id[:2]>/<run_id>.json.gz``, listed from ``<root>/index.sqlite3``."""
+
+    def __init__(self, root=REPORTS_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS reports (
+                run_id TEXT PRIMARY KEY,
+                company_name TEXT,
+                role TEXT,
+                created_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                version INTEGER NOT NULL,
+                owner TEXT,
+                share_token TEXT
+            )"""
+        )
+        # Indexes created before reports had owners
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(reports)")}
+        for column in ("owner", "share_token"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE reports ADD COLUMN {column} TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reports_created_at ON reports (created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reports_owner ON reports (owner, created_at)")
+        self._conn.commit()
+
+    def path_for(self, run_id):
+        return os.path.join(self.root, run_id[:2], f"{run_id}.json.gz")
+
+    def save(self, run_id, inputs, result, owner=None):
+        """Write the artifact for a finished CrewOutput whose ``raw`` is the final report."""
+        artifact = {
+            "version": ARTIFACT_VERSION,
+            "run_id": run_id,
+            "owner": owner,
+            "created_at": time.time(),
+            "inputs": inputs,
+            "markdown": result.raw,
+            "tasks": {output.name: _task_entry(output) for output in result.tasks_output if output.name},
+        }
+        payload = gzip.compress(json.dumps(artifact).encode("utf-8"))
+        path = self.path_for(run_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".report-")
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(payload)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports (run_id, company_name, role, created_at, size, version, owner, "
+                "share_token) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, inputs.get("company_name"), inputs.get("role"), artifact["created_at"], len(payload),
+                 ARTIFACT_VERSION, owner, secrets.token_urlsafe(16)),
+            )
+            self._conn.commit()
+        _load_artifact.cache_clear()
+        return path
+
+    def allowed(self, run_id, owner=None, share_token=None):
+        """Whether ``owner`` ran ``run_id`` or ``share_token`` is its share token."""
+        with self._lock:
+            row = self._conn.execute("SELECT owner, share_token FROM reports WHERE run_id = ?",
+                                     (run_id,)).fetchone()
+        if row is None:
+            return False
+        if owner and row["owner"] == owner:
+            return True
+        return bool(share_token and row["share_token"]
+                    and hmac.compare_digest(share_token, row["share_token"]))
+
+    def share_token(self, run_id, owner):
+        """The token that lets anyone open ``run_id``, for its owner only; else None."""
+        with self._lock:
+            row = self._conn.execute("SELECT share_token FROM reports WHERE run_id = ? AND owner = ?",
+                                     (run_id, owner)).fetchone()
+        return row["share_token"] if row else None
+
+    def load(self, run_id, owner=None, share_token=None):
+        """The artifact dict, or None when it is missing or readable by neither ``owner`` nor ``share_token``."""
+        path = self.path_for(run_id)
+        if not os.path.exists(path) or not self.allowed(run_id, owner, share_token):
+            return None
+        return _load_artifact(path, os.path.getmtime(path))
+
+    def list(self, owner, limit=20, offset=0, search=None):
+        """``owner``'s index rows, newest first; ``search`` filters on company or role."""
+        sql = "SELECT run_id, company_name, role, created_at, size FROM reports WHERE owner = ?"
+        params = [owner]
+        if search:
+            sql += " AND (company_name LIKE ? OR role LIKE ?)"
+            params += [f"%{search}%", f"%{search}%"]
+        sql += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit, offset]).fetchall()
+        return [dict(row) for row in rows]
+
+    def export(self, run_id, fmt, owner=None, share_token=None):
+        """The report as ``fmt`` ("md", "html" or "pdf") bytes, or None when missing or not readable."""
+        path = self.path_for(run_id)
+        if not os.path.exists(path) or not self.allowed(run_id, owner, share_token):
+            return None
+        return _render(path, os.path.getmtime(path), fmt)
+
+
+def _upgrade(artifact):
+    if artifact.get("version", 1) > ARTIFACT_VERSION:
+        raise ValueError(f"Report artifact version {artifact['version']} is newer than this app supports")
+    if artifact.get("version", 1) < 2:
+        # Version 1 artifacts were saved before reports had owners
+        artifact["owner"] = None
+    artifact["version"] = ARTIFACT_VERSION
+    return artifact
+
+
+@lru_cache(maxsize=64)
+def _load_artifact(path, mtime):
+    with gzip.open(path, "rb") as f:
+        return _upgrade(json.loads(f.read().decode("utf-8")))
+
+
+# Links and images to anything but http(s)/mailto (javascript:, data:, ...) are dropped from exports
+_UNSAFE_LINK_PATTERN = re.compile(r'<a href="(?!https?://|mailto:)[^"]*"[^>]*>(.*?)</a>', re.I | re.S)
+_UNSAFE_IMG_PATTERN = re.compile(r'<img [^>]*src="(?!https?://)[^"]*"[^>]*>', re.I)
+
+
+def _html_body(markdown_text):
+    """The report as HTML. The text comes from LLM and search output, so raw HTML in it is escaped."""
+    try:
+        import markdown
+    except ImportError:
+        return f"<pre>{html.escape(markdown_text)}</pre>"
+    # Only & and < need escaping to disable tags; > still starts a blockquote
+    escaped = markdown_text.replace("&", "&amp;").replace("<", "&lt;")
+    body = markdown.markdown(escaped, extensions=["tables"])
+    return _UNSAFE_IMG_PATTERN.sub("", _UNSAFE_LINK_PATTERN.sub(r"\1", body))
+
+
+def to_html(markdown_text, title="JobFlowAI report"):
+    return (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head>"
+            f"<body>{_html_body(markdown_text)}</body></html>")
+
+
+def to_pdf(markdown_text, title="JobFlowAI report"):
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_title(title)
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=11)
+    # The core PDF fonts only cover Latin-1
+    pdf.write_html(_html_body(markdown_text).encode("latin-1", "replace").decode("latin-1"))
+    return bytes(pdf.output())
+
+
+@lru_cache(maxsize=32)
+def _render(path, mtime, fmt):
+    artifact = _load_artifact(path, mtime)
+    title = f"{artifact['inputs'].get('role', '')} at {artifact['inputs'].get('company_name', '')}".strip()
+    if fmt == "md":
+        return artifact["markdown"].encode("utf-8")
+    if fmt == "html":
+        return to_html(artifact["markdown"], title).encode("utf-8")
+    if fmt == "pdf":
+        return to_pdf(artifact["markdown"], title)
+    raise ValueError(f"Unknown export format: {fmt}")
@@ -0,0 +1,155 @@
+"""Parse, chunk and embed a resume once per content hash.
+
+Passing PDFKnowledgeSource to every Crew re-chunked and re-embedded the
+resume on every analysis. Here the vectors are persisted under
+``<root>/<sha256>/<embedder id>/`` and later runs load them from disk. The
+embedding backend is pluggable: GoogleEmbedder calls text-embedding-004 in
+batches, HashingEmbedder is a local deterministic stand-in for tests and
+offline runs.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from resume_parser import get_parser
+
+RESUME_INDEX_DIR = os.getenv("RESUME_INDEX_DIR", os.path.join("data", "resume_index"))
+
+# Same defaults as crewai's knowledge sources
+CHUNK_SIZE = 4000
+CHUNK_OVERLAP = 200
+
+
+class GoogleEmbedder:
+    """Gemini embeddings, sent ``batch_size`` texts per request.
+
+    Each embedder has its own API client for its key; ``genai.configure``
+    would set one key for the whole process, shared by every concurrent job.
+    """
+
+    def __init__(self, api_key, model="models/text-embedding-004", batch_size=100):
+        self.api_key = api_key
+        self.model = model
+        self.batch_size = batch_size
+        self.id = model.replace("/", "_")
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def client(self):
+        with self._client_lock:
+            if self._client is None:
+                from google.ai import generativelanguage as glm
+                from google.api_core.client_options import ClientOptions
+
+                self._client = glm.GenerativeServiceClient(client_options=ClientOptions(api_key=self.api_key))
+            return self._client
+
+    def embed(self, texts, task_type="retrieval_document"):
+        import google.generativeai as genai
+
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            response = genai.embed_content(model=self.model, content=batch, task_type=task_type,
+                                           client=self.client())
+            vectors.extend(response["embedding"])
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder that needs no network or keys."""
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.id = f"hashing-{dim}"
+
+    def embed(self, texts, task_type="retrieval_document"):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r"\w+", text.lower()):
+                bucket = int.from_bytes(hashlib.md5(token.encode("utf-8")).digest()[:4], "little")
+                vectors[row, bucket % self.dim] += 1.0
+        return vectors
+
+
+def file_hash(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def chunk_text(text, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    text = text.strip()
+    if not text:
+        return []
+    step = max(1, chunk_size - overlap)
+    return [text[start:start + chunk_size] for start in range(0, max(len(text) - overlap, 1), step)]
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class ResumeIndex:
+    """Resume chunks and their unit-length embedding vectors."""
+
+    def __init__(self, digest, chunks, vectors):
+        self.digest = digest
+        self.chunks = chunks
+        self.vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+
+    def search(self, query_vectors, k=3):
+        """Top ``k`` chunks for each query vector, best first."""
+        if not self.chunks:
+            return [[] for _ in range(len(query_vectors))]
+        scores = _normalize(np.asarray(query_vectors, dtype=np.float32)) @ self.vectors.T
+        top = np.argsort(-scores, axis=1)[:, :k]
+        return [[self.chunks[i] for i in row] for row in top]
+
+    def context_for(self, queries, embedder, k=3):
+        """Resume excerpts for every query, embedding all queries in one batch."""
+        if not queries:
+            return []
+        results = self.search(embedder.embed(queries, task_type="retrieval_query"), k=k)
+        return ["\n\n".join(chunks) for chunks in results]
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "chunks.json"), "w") as f:
+            json.dump(self.chunks, f)
+        np.save(os.path.join(directory, "vectors.npy"), self.vectors)
+
+
+@lru_cache(maxsize=32)
+def _load_index(directory, digest):
+    with open(os.path.join(directory, "chunks.json")) as f:
+        chunks = json.load(f)
+    return ResumeIndex(digest, chunks, np.load(os.path.join(directory, "vectors.npy")))
+
+
+def load_or_build_index(resume_path, embedder, root=RESUME_INDEX_DIR):
+    """Return the index for the PDF or DOCX at ``resume_path``, building and persisting it on first use."""
+    digest = file_hash(resume_path)
+    directory = os.path.join(root, digest, embedder.id)
+    if not os.path.exists(directory):
+        # Usually already parsed in the background when the resume was uploaded
+        chunks = chunk_text(get_parser().parse(resume_path, digest)["text"])
+        vectors = embedder.embed(chunks) if chunks else np.zeros((0, 1), dtype=np.float32)
+        # Build in a private directory and rename, so readers never see half an index
+        tmp_directory = f"{directory}.tmp-{os.getpid()}-{threading.get_ident()}"
+        ResumeIndex(digest, chunks, vectors).save(tmp_directory)
+        try:
+            os.rename(tmp_directory, directory)
+        except OSError:
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+    return _load_index(directory, digest)
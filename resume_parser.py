@@ -0,0 +1,221 @@
+"""Resume text extraction shared by every page: PDF and DOCX into normalized sections.
+
+Uploads are identified by content hash, so a resume is parsed once per
+process no matter how many pages, sessions or analyses use it: results sit
+in an LRU of RESUME_PARSE_CACHE entries. Parsing runs in a small process
+pool, which keeps pdfplumber's CPU work off the Streamlit script thread
+(``submit`` returns at once) and means a huge or malformed file cannot
+exhaust the app's memory. PDFs are read page by page, releasing each
+page's layout objects before the next, and stop after RESUME_MAX_PAGES.
+
+The result is a plain dict: ``digest``, ``format``, ``pages``, ``text``,
+``sections`` (summary, skills, experience, education, projects,
+certifications, other; empty strings when absent) and ``skills`` as a list.
+"""
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+RESUME_PARSE_WORKERS = int(os.getenv("RESUME_PARSE_WORKERS", 2))
+RESUME_PARSE_CACHE = int(os.getenv("RESUME_PARSE_CACHE", 128))
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", 30))
+
+RESUME_SUFFIXES = {"pdf": ".pdf", "docx": ".docx"}
+
+# Heading text (lowercase, without punctuation) -> normalized section
+SECTION_HEADINGS = {
+    "summary": "summary", "profile": "summary", "professional summary": "summary", "objective": "summary",
+    "about me": "summary", "career objective": "summary",
+    "skills": "skills", "technical skills": "skills", "key skills": "skills", "core competencies": "skills",
+    "technologies": "skills", "tools and technologies": "skills", "skills and tools": "skills",
+    "experience": "experience", "work experience": "experience", "professional experience": "experience",
+    "employment": "experience", "employment history": "experience", "internships": "experience",
+    "work history": "experience",
+    "education": "education", "academic background": "education", "academics": "education",
+    "education and training": "education",
+    "projects": "projects", "personal projects": "projects", "academic projects": "projects",
+    "certifications": "certifications", "certificates": "certifications", "licenses and certifications": "certifications",
+    "awards": "other", "achievements": "other", "publications": "other", "languages": "other",
+    "interests": "other", "volunteering": "other", "extracurricular activities": "other",
+}
+SECTIONS = ("summary", "skills", "experience", "education", "projects", "certifications", "other")
+
+_SKILL_SEPARATORS = re.compile(r"[,;|•·\n]+|\s{2,}")
+_SKILL_LABEL = re.compile(r"^[A-Za-z /&]{2,30}:\s*")
+
+
+def detect_format(head):
+    """"pdf" or "docx" from a file's first bytes; raises ValueError for anything else."""
+    if head.startswith(b"%PDF"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "docx"
+    raise ValueError("Unsupported resume format; please upload a PDF or DOCX file.")
+
+
+def resume_suffix(data):
+    return RESUME_SUFFIXES[detect_format(data[:8])]
+
+
+def iter_pdf_pages(path, max_pages=RESUME_MAX_PAGES):
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages[:max_pages]:
+            yield page.extract_text() or ""
+            # Drop the page's parsed layout objects before reading the next one
+            page.close()
+
+
+def iter_docx_blocks(path):
+    import docx
+
+    document = docx.Document(path)
+    for paragraph in document.paragraphs:
+        yield paragraph.text
+    for table in document.tables:
+        for row in table.rows:
+            yield " | ".join(cell.text.strip() for cell in row.cells if cell.text.strip())
+
+
+def _heading(line):
+    key = re.sub(r"[^a-z ]+", "", line.lower()).strip()
+    key = re.sub(r"\s+", " ", key)
+    # Headings are short lines; "Experience: 5 years" is not one
+    if len(line) > 40 or line.rstrip().endswith((".", ",")):
+        return None
+    return SECTION_HEADINGS.get(key)
+
+
+def split_sections(text):
+    """``{section: text}`` for every normalized section; text before the first heading is ignored."""
+    sections = {name: [] for name in SECTIONS}
+    current = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        heading = _heading(stripped)
+        if heading:
+            current = heading
+        elif current:
+            sections[current].append(stripped)
+    return {name: "\n".join(lines) for name, lines in sections.items()}
+
+
+def parse_skills(section):
+    """The skills section as a de-duplicated list, without "Languages:"-style labels."""
+    skills = []
+    seen = set()
+    for line in section.splitlines():
+        for skill in _SKILL_SEPARATORS.split(_SKILL_LABEL.sub("", line)):
+            skill = skill.strip(" -*\t")
+            if skill and len(skill) <= 40 and skill.lower() not in seen:
+                seen.add(skill.lower())
+                skills.append(skill)
+    return skills
+
+
+def parse_file(path, digest=None, max_pages=RESUME_MAX_PAGES):
+    """Parse the resume at ``path``; runs in the worker processes."""
+    with open(path, "rb") as f:
+        fmt = detect_format(f.read(8))
+    blocks = list(iter_pdf_pages(path, max_pages)) if fmt == "pdf" else list(iter_docx_blocks(path))
+    text = "\n".join(blocks).strip()
+    sections = split_sections(text)
+    return {
+        "digest": digest,
+        "format": fmt,
+        "pages": len(blocks) if fmt == "pdf" else None,
+        "text": text,
+        "sections": sections,
+        "skills": parse_skills(sections["skills"]),
+    }
+
+
+def _file_digest(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ResumeParser:
+    """Process-pool parser with an LRU of results keyed by content hash."""
+
+    def __init__(self, max_workers=RESUME_PARSE_WORKERS, cache_size=RESUME_PARSE_CACHE):
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            # Forking a threaded Streamlit server is unsafe; spawn fresh interpreters instead
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def cached(self, digest):
+        """The parsed resume for ``digest`` if it is in the cache, else None."""
+        with self._lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                return self._cache[digest]
+        return None
+
+    def submit(self, path, digest=None):
+        """A Future of the parsed resume at ``path``; cached and in-flight results are shared."""
+        digest = digest or _file_digest(path)
+        with self._lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                future = Future()
+                future.set_result(self._cache[digest])
+                return future
+            if digest in self._in_flight:
+                return self._in_flight[digest]
+            future = self._get_pool().submit(parse_file, path, digest)
+            self._in_flight[digest] = future
+        future.add_done_callback(lambda done: self._store(digest, done))
+        return future
+
+    def parse(self, path, digest=None, timeout=None):
+        """Blocking ``submit(...).result()``, for worker threads and scripts."""
+        return self.submit(path, digest).result(timeout=timeout)
+
+    def _store(self, digest, future):
+        with self._lock:
+            self._in_flight.pop(digest, None)
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                if isinstance(future.exception(), BrokenProcessPool):
+                    # A worker died (e.g. out of memory); start a fresh pool on the next submit
+                    self._pool = None
+                return
+            self._cache[digest] = future.result()
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+_parser = None
+_parser_lock = threading.Lock()
+
+
+def get_parser():
+    """The process-wide ResumeParser, shared by the pages and the analysis workers."""
+    global _parser
+    with _parser_lock:
+        if _parser is None:
+            _parser = ResumeParser()
+        return _parser
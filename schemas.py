@@ -0,0 +1,103 @@
+"""Typed task outputs, set as each Task's ``output_pydantic``.
+
+Agents answer with JSON matching these models instead of free text, so the
+final report can be assembled in Python (see report.py) and outputs can be
+cached, diffed and compared field by field. Bump SCHEMA_VERSION whenever a
+model changes so cached outputs of the old shape are not reused.
+"""
+from typing import List
+
+from pydantic import BaseModel, Field
+
+SCHEMA_VERSION = 2
+
+
+class JobOpening(BaseModel):
+    title: str
+    location: str = ""
+    url: str = Field("", description="Link to apply or to the posting")
+    description: str = Field("", description="Key requirements, for ATS_Agent")
+
+
+class JobOpenings(BaseModel):
+    openings: List[JobOpening] = []
+    careers_page: str = Field("", description="The company's careers page, especially when no opening matches")
+
+
+class ATSEvaluation(BaseModel):
+    job_role: str
+    ats_score: int = Field(..., ge=0, le=100, description="How well the resume matches the job description")
+    feedback: str = Field(..., description="Strengths, weaknesses and actionable suggestions")
+    contextual_fit: str = ""
+
+
+class ATSReport(BaseModel):
+    evaluations: List[ATSEvaluation] = []
+
+
+class CompanyBrief(BaseModel):
+    summary: str = Field(..., description="Conversational summary of recent news and key developments")
+    ceo: str = ""
+    sources: List[str] = []
+
+
+class ReviewTheme(BaseModel):
+    theme: str = Field(..., description="e.g. work-life balance, salary, growth")
+    summary: str
+
+
+class ReviewSummary(BaseModel):
+    themes: List[ReviewTheme] = []
+    difficulty_score: int = Field(..., ge=1, le=10, description="Difficulty of getting hired, out of 10")
+    difficulty_reason: str = ""
+    sources: List[str] = []
+
+
+class OutreachContact(BaseModel):
+    username: str = Field(..., description="LinkedIn profile URL or username")
+    message: str = Field(..., description="Personalized message for the user to send")
+
+
+class OutreachList(BaseModel):
+    contacts: List[OutreachContact] = []
+
+
+class InterviewQuestion(BaseModel):
+    question: str
+    category: str = Field(..., description="technical, hr, coding or resume")
+    source_url: str = ""
+
+
+class QuestionBank(BaseModel):
+    questions: List[InterviewQuestion] = []
+
+
+class HRContact(BaseModel):
+    name: str
+    title: str = ""
+    contact: str = Field(..., description="LinkedIn profile, e-mail address or careers page")
+    confidence: float = Field(0.5, ge=0, le=1, description="How likely the contact is genuine")
+
+
+class HRContacts(BaseModel):
+    contacts: List[HRContact] = []
+
+
+class ReportNarrative(BaseModel):
+    overview: str = Field(..., description="Two or three sentences on the user's prospects for the role")
+    next_steps: List[str] = Field([], description="At most five concrete next steps")
+
+
+# Output model per task name
+TASK_SCHEMAS = {
+    "job_scout": JobOpenings,
+    "ats_agent": ATSReport,
+    "company_insider": CompanyBrief,
+    "review_radar": ReviewSummary,
+    "alumni_connector": OutreachList,
+    "mentor_finder": OutreachList,
+    "interview_insider": OutreachList,
+    "interview_insight": QuestionBank,
+    "hr_hunter": HRContacts,
+    "report_master": ReportNarrative,
+}
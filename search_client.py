@@ -0,0 +1,250 @@
+"""Pooled, rate-limited Serper client shared by every agent and job in the process.
+
+SerperDevTool opens a new HTTPS connection for every call and has no notion
+of quota, so concurrent agents and jobs pay connection setup each time and
+run into 429s together. SerperSearchClient runs one asyncio loop on a
+background thread with an httpx.AsyncClient keep-alive pool; every search,
+from whichever worker thread, goes through it:
+
+- identical queries already in flight share one request,
+- a token bucket caps the request rate for the whole process,
+- 429s, 5xx and connection errors are retried with exponential backoff and
+  full jitter, honoring Retry-After.
+
+It has the name, description, args_schema and ``run(search_query=...)`` of
+a crewai search tool, so tools.cached_search_tool wraps it like any backend.
+Point SERPER_URL at a local server to exercise it offline:
+
+    python search_client.py --mock --queries 40 --distinct 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import threading
+import time
+
+from pydantic import BaseModel, Field
+
+SERPER_URL = os.getenv("SERPER_URL", "https://google.serper.dev/search")
+SEARCH_RATE = float(os.getenv("SEARCH_RATE", 5))
+SEARCH_BURST = int(os.getenv("SEARCH_BURST", 10))
+SEARCH_MAX_CONNECTIONS = int(os.getenv("SEARCH_MAX_CONNECTIONS", 10))
+SEARCH_MAX_RETRIES = int(os.getenv("SEARCH_MAX_RETRIES", 3))
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", 15))
+SEARCH_RESULTS = int(os.getenv("SEARCH_RESULTS", 10))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+
+class SearchError(RuntimeError):
+    pass
+
+
+class SearchSchema(BaseModel):
+    search_query: str = Field(..., description="Mandatory search query you want to use to search the internet")
+
+
+class TokenBucket:
+    """``rate`` tokens per second, at most ``capacity`` saved up; used from one event loop."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Seconds to wait before retry ``attempt`` (1-based): Retry-After, else full jitter."""
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class SerperSearchClient:
+    """Thread-safe search backend; ``run`` blocks the calling thread, not the loop."""
+
+    name = "Search the internet"
+    description = "A tool that can be used to search the internet with a search_query."
+    args_schema = SearchSchema
+
+    def __init__(self, api_key=None, url=SERPER_URL, rate=SEARCH_RATE, burst=SEARCH_BURST,
+                 max_connections=SEARCH_MAX_CONNECTIONS, max_retries=SEARCH_MAX_RETRIES,
+                 timeout=SEARCH_TIMEOUT, n_results=SEARCH_RESULTS):
+        self.api_key = api_key
+        self.url = url
+        self.rate = rate
+        self.burst = burst
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.n_results = n_results
+        self.requests = 0
+        self.coalesced = 0
+        self.retries = 0
+        self._in_flight = {}
+        self._loop = None
+        self._client = None
+        self._bucket = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return self._loop
+            import httpx
+
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="search-client", daemon=True).start()
+
+            async def setup():
+                self._bucket = TokenBucket(self.rate, self.burst)
+                self._client = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=self.max_connections,
+                                        max_keepalive_connections=self.max_connections),
+                )
+
+            asyncio.run_coroutine_threadsafe(setup(), loop).result()
+            self._loop = loop
+            return loop
+
+    def run(self, search_query="", **kwargs):
+        """The Serper JSON result for ``search_query``; raises SearchError once retries are spent."""
+        future = asyncio.run_coroutine_threadsafe(self.search(search_query), self._ensure_loop())
+        return future.result()
+
+    async def search(self, query):
+        # Every waiter gets the same result (or error) as the first caller
+        key = " ".join(str(query).split()).lower()
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+        task = asyncio.ensure_future(self._fetch(query))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, query):
+        import httpx
+
+        headers = {"X-API-KEY": self.api_key or os.getenv("SERPER_API_KEY", ""), "Content-Type": "application/json"}
+        payload = {"q": query, "num": self.n_results}
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            self.requests += 1
+            retry_after = None
+            try:
+                response = await self._client.post(self.url, json=payload, headers=headers)
+            except httpx.TransportError as error:
+                failure = f"{type(error).__name__}: {error}"
+            else:
+                if response.status_code < 400:
+                    return response.json()
+                if response.status_code not in RETRY_STATUSES:
+                    raise SearchError(f"Search failed with HTTP {response.status_code}: {response.text[:200]}")
+                failure = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+            if attempt == self.max_retries:
+                raise SearchError(f"Search failed after {attempt + 1} attempts: {failure}")
+            self.retries += 1
+            await asyncio.sleep(backoff_delay(attempt + 1, retry_after))
+
+    def close(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+
+def _serve_mock(latency, fail_every):
+    """A local Serper stand-in on a free port; returns (server, hit counter)."""
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    hits = {"count": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with lock:
+                hits["count"] += 1
+                count = hits["count"]
+            time.sleep(latency)
+            if fail_every and count % fail_every == 0:
+                data, status = b'{"message": "rate limited"}', 429
+            else:
+                status = 200
+                data = json.dumps({"searchParameters": {"q": body["q"]}, "organic": [
+                    {"title": f"{body['q']} {rank}", "link": f"https://example.com/{rank}", "snippet": "Mock."}
+                    for rank in range(1, 4)]}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if status == 429:
+                self.send_header("Retry-After", "0.1")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hits
+
+
+def main():
+    from concurrent.futures import ThreadPoolExecutor
+
+    parser = argparse.ArgumentParser(description="Fire concurrent searches through the client")
+    parser.add_argument("--mock", action="store_true", help="Serve a local mock Serper instead of the real API")
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--distinct", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=SEARCH_RATE)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock response time in seconds")
+    parser.add_argument("--fail-every", type=int, default=0, help="Mock answers every Nth request with a 429")
+    args = parser.parse_args()
+
+    url, hits = SERPER_URL, None
+    if args.mock:
+        server, hits = _serve_mock(args.latency, args.fail_every)
+        url = f"http://127.0.0.1:{server.server_port}/search"
+    client = SerperSearchClient(url=url, rate=args.rate)
+    queries = [f"query {position % args.distinct}" for position in range(args.queries)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(lambda query: client.run(search_query=query), queries))
+    elapsed = time.perf_counter() - started
+    client.close()
+    print(f"{len(results)} searches in {elapsed:.2f}s: {client.requests} requests sent, "
+          f"{client.coalesced} coalesced, {client.retries} retried"
+          + (f", {hits['count']} reached the mock server" if hits else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""A stable client ID per browser, shared by every page.
+
+Per-user admission limits (admission.py) and report ownership
+(report_store.py) key on it. The client's IP address is no use for either:
+behind a reverse proxy or NAT every visitor has the same one. The ID is
+derived from Streamlit's XSRF cookie, which the server issues once per
+browser and which never appears in a URL: a refresh or a new tab keeps the
+same client, while a copied link carries no identity. With XSRF protection
+disabled there is no such cookie and the ID lasts for one browser session.
+"""
+import hashlib
+import uuid
+
+import streamlit as st
+
+XSRF_COOKIE = "_streamlit_xsrf"
+
+
+def client_id():
+    """This browser's client ID, created on first use."""
+    if "client_id" not in st.session_state:
+        cookie = st.context.cookies.get(XSRF_COOKIE)
+        # Hashed, so the ID stored with jobs and reports is not the cookie itself
+        st.session_state.client_id = (hashlib.sha256(cookie.encode("utf-8")).hexdigest()[:32]
+                                      if cookie else uuid.uuid4().hex)
+    return st.session_state.client_id
@@ -0,0 +1,252 @@
+"""Per (company, role) snapshots of what earlier analyses found, for incremental re-runs.
+
+After every run the job openings, HR contacts, review sources and interview
+questions are stored as items keyed by URL (questions by their text), taken
+from the typed task outputs or, failing that, from the lines of the text,
+and merged into what earlier runs found. A later run of the same
+company and role diffs its outputs against the snapshot, so the report can
+lead with what changed. In incremental mode the research agents are also
+shown what is already known and asked for newer material only, which turns
+a periodic re-check into a much smaller run.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from report import structured
+
+SNAPSHOT_DB_PATH = os.getenv("SNAPSHOT_DB_PATH", os.path.join("data", "snapshots.sqlite3"))
+
+# Tracked tasks and what their items are called in the change summary
+TRACKED_TASKS = {
+    "job_scout": "job openings",
+    "hr_hunter": "HR contacts",
+    "review_radar": "review sources",
+    "interview_insight": "interview questions",
+}
+
+# The task whose prompt gets the change summary
+SUMMARY_TASK = "report_master"
+
+# Items not found again for this long are dropped from the snapshot
+STALE_AFTER = int(os.getenv("SNAPSHOT_STALE_AFTER", 30 * 24 * 3600))
+MAX_CONTEXT_ITEMS = 30
+
+_URL_PATTERN = re.compile(r"https?://[^\s)\]>\"'<]+")
+_BULLET_PATTERN = re.compile(r"^\s*(?:[-*+•]|\d+[.)])\s*")
+_TRACKING_PARAMS = re.compile(r"[?&](?:utm_[^=&]+|trk|refId|trackingId)=[^&#]*")
+
+# Fields of the schemas.py models that hold an item's link and its label
+_LINK_FIELDS = ("url", "contact", "username")
+_LABEL_FIELDS = ("title", "name", "theme")
+
+
+def normalize_url(url):
+    url = url.rstrip(".,;:!*")
+    url = _TRACKING_PARAMS.sub("", url).split("#")[0]
+    return url.rstrip("/").lower()
+
+
+def extract_items(text):
+    """Items of one task output: lines with a URL, keyed by that URL, and questions.
+
+    A line with several URLs yields one item per URL; a bullet ending in "?"
+    without a URL is keyed by its normalized text.
+    """
+    items = {}
+    for line in (text or "").splitlines():
+        label = _BULLET_PATTERN.sub("", line).replace("**", "").strip()
+        if not label:
+            continue
+        urls = _URL_PATTERN.findall(line)
+        for url in urls:
+            items.setdefault(normalize_url(url), label)
+        if not urls and label.endswith("?"):
+            items.setdefault(_question_key(label), label)
+    return items
+
+
+def _question_key(question):
+    return "q:" + re.sub(r"\W+", " ", question).strip().lower()
+
+
+def structured_items(data):
+    """Items of a typed task output (see schemas.py), keyed like extract_items."""
+    items = {}
+
+    def visit(value):
+        if isinstance(value, dict):
+            if value.get("question"):
+                source = f" ({value['source_url']})" if value.get("source_url") else ""
+                items.setdefault(_question_key(value["question"]), value["question"] + source)
+                return
+            link = next((value[field] for field in _LINK_FIELDS if value.get(field)), "")
+            label = next((value[field] for field in _LABEL_FIELDS if value.get(field)), "")
+            if link:
+                items.setdefault(normalize_url(link), f"{label} {link}".strip())
+            for child in value.values():
+                visit(child)
+        elif isinstance(value, list):
+            for child in value:
+                visit(child)
+        elif isinstance(value, str) and _URL_PATTERN.fullmatch(value):
+            items.setdefault(normalize_url(value), value)
+
+    visit(data.model_dump())
+    return items
+
+
+def _key(value):
+    return re.sub(r"\s+", " ", str(value or "")).strip().lower()
+
+
+class SnapshotStore:
+    """Merged items per (company, role, task) in SQLite, with first/last seen times."""
+
+    def __init__(self, path=SNAPSHOT_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS snapshots (
+                company TEXT NOT NULL,
+                role TEXT NOT NULL,
+                task_name TEXT NOT NULL,
+                items TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (company, role, task_name)
+            )"""
+        )
+        self._conn.commit()
+
+    def load(self, company, role):
+        """``{task_name: {"items": {key: item}, "updated_at": ts}}`` for the pair."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_name, items, updated_at FROM snapshots WHERE company = ? AND role = ?",
+                (_key(company), _key(role)),
+            ).fetchall()
+        return {task_name: {"items": json.loads(items), "updated_at": updated_at}
+                for task_name, items, updated_at in rows}
+
+    def merge(self, company, role, task_name, found):
+        """Merge ``found`` (key -> label) into the snapshot; return the new keys."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT items FROM snapshots WHERE company = ? AND role = ? AND task_name = ?",
+                (_key(company), _key(role), task_name),
+            ).fetchone()
+            items = json.loads(row[0]) if row else {}
+            added = [key for key in found if key not in items]
+            for key, label in found.items():
+                item = items.setdefault(key, {"label": label, "first_seen": now})
+                item["last_seen"] = now
+            items = {key: item for key, item in items.items() if now - item["last_seen"] <= STALE_AFTER}
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (company, role, task_name, items, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (_key(company), _key(role), task_name, json.dumps(items), now),
+            )
+            self._conn.commit()
+        return added
+
+
+def _format_items(items, limit=MAX_CONTEXT_ITEMS):
+    lines = []
+    for key, item in list(items.items())[:limit]:
+        lines.append(f"- {item['label']}" + ("" if key.startswith("q:") or key in item["label"].lower() else f" ({key})"))
+    return "\n".join(lines)
+
+
+class IncrementalRun:
+    """Diffs one run's tracked task outputs against the stored snapshot.
+
+    ``context_for(task)`` is asked for extra context as each task starts and
+    ``record(task, output)`` is called as each task finishes (see
+    dag_executor.kickoff_graph). With ``incremental`` set, tracked tasks are
+    told what is already known and asked for newer material only.
+    """
+
+    def __init__(self, store, company, role, incremental=False):
+        self.store = store
+        self.company = company
+        self.role = role
+        self.incremental = incremental
+        self.previous = store.load(company, role)
+        self.added = {}
+        self._lock = threading.Lock()
+
+    def context_for(self, task):
+        if task.name == SUMMARY_TASK:
+            return self.change_summary()
+        previous = self.previous.get(task.name)
+        if not self.incremental or task.name not in TRACKED_TASKS or not previous or not previous["items"]:
+            return ""
+        since = time.strftime("%Y-%m-%d", time.localtime(previous["updated_at"]))
+        return (f"An earlier analysis on {since} already found these {TRACKED_TASKS[task.name]}. Do not research "
+                f"them again; report only material that is newer or missing from this list, and say so "
+                f"plainly if there is nothing new:\n{_format_items(previous['items'])}")
+
+    def record(self, task, output):
+        if task.name not in TRACKED_TASKS:
+            return
+        data = structured(task.name, output)
+        found = structured_items(data) if data is not None else extract_items(output.raw)
+        added = self.store.merge(self.company, self.role, task.name, found)
+        with self._lock:
+            self.added[task.name] = added
+
+    def changes(self):
+        """``(since, [(label, new_items, known_items)])`` per tracked task, or None on a first run.
+
+        Known items are only listed in incremental mode, where the task
+        outputs themselves hold nothing but the new material.
+        """
+        if not self.previous:
+            return None
+        since = time.strftime("%Y-%m-%d", time.localtime(max(entry["updated_at"] for entry in self.previous.values())))
+        current = self.store.load(self.company, self.role)
+        with self._lock:
+            added = dict(self.added)
+        changes = []
+        for task_name, label in TRACKED_TASKS.items():
+            items = current.get(task_name, {}).get("items", {})
+            keys = set(added.get(task_name, []))
+            new = {key: item for key, item in items.items() if key in keys}
+            known = {key: item for key, item in items.items() if key not in keys} if self.incremental else {}
+            changes.append((label, new, known))
+        return since, changes
+
+    def change_summary(self):
+        """The new material of this run, for ReportMaster to weigh in its overview."""
+        changes = self.changes()
+        if changes is None:
+            return ""
+        since, sections = changes
+        lines = [f"This company and role were analyzed before, last on {since}. "
+                 f"Mention the most important of these changes in the overview."]
+        for label, new, _ in sections:
+            lines.append(f"New {label}:\n{_format_items(new)}" if new else f"New {label}: none")
+        return "\n\n".join(lines)
+
+    def changes_section(self):
+        """Markdown "What changed" section for the final report, or "" on a first run."""
+        changes = self.changes()
+        if changes is None:
+            return ""
+        since, sections = changes
+        lines = [f"## What Changed Since {since}", ""]
+        for label, new, known in sections:
+            lines.append(f"**New {label}:**" + ("" if new else " none"))
+            if new:
+                lines.append(_format_items(new))
+            if known:
+                lines += ["", f"**Already known {label}:**", _format_items(known)]
+            lines.append("")
+        return "\n".join(lines).strip()
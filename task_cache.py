@@ -0,0 +1,105 @@
+"""Per-task output cache so repeat analyses skip the company-level research.
+
+Only tasks listed in TASK_CACHE_TTLS are cached. Each entry is keyed on the
+inputs the task actually reads: the ``{variables}`` referenced by its prompt
+templates, the outputs of its context tasks, the model, the output schema
+version, the prompt mode (full or compact personas) and, for tasks that
+read the resume, the resume hash. Tasks that depend on the resume or the
+university therefore rerun while CompanyInsider, ReviewRadar and friends are
+served from disk.
+"""
+import hashlib
+import json
+import re
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Staleness window per task name; tasks not listed here are never cached
+TASK_CACHE_TTLS = {
+    "job_scout": 6 * HOUR,
+    "company_insider": 3 * DAY,
+    "review_radar": 7 * DAY,
+    "interview_insight": 7 * DAY,
+    "hr_hunter": 3 * DAY,
+}
+
+# InterviewInsight also writes resume-based questions, so its entries are per resume
+RESUME_DEPENDENT_TASKS = {"interview_insight"}
+
+_VARIABLE_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+def task_variables(task):
+    """Names of the ``{placeholders}`` used by a task and its agent."""
+    agent = task.agent
+    templates = [
+        getattr(task, "_original_description", None) or task.description,
+        getattr(task, "_original_expected_output", None) or task.expected_output,
+        getattr(agent, "_original_role", None) or agent.role,
+        getattr(agent, "_original_goal", None) or agent.goal,
+        getattr(agent, "_original_backstory", None) or agent.backstory,
+    ]
+    names = set()
+    for template in templates:
+        names.update(_VARIABLE_PATTERN.findall(template or ""))
+    return sorted(names)
+
+
+class TaskCache:
+    """Stores TaskOutputs in a PersistentCache with a TTL per task name."""
+
+    def __init__(self, cache, ttls=None, resume_dependent=None):
+        self.cache = cache
+        self.ttls = TASK_CACHE_TTLS if ttls is None else ttls
+        self.resume_dependent = RESUME_DEPENDENT_TASKS if resume_dependent is None else resume_dependent
+
+    def key_for(self, task, inputs, context_outputs, scope):
+        """Cache key for one task run, or None when the task is not cacheable."""
+        if task.name not in self.ttls:
+            return None
+
+        payload = {
+            "task": task.name,
+            "model": scope.get("model"),
+            "schema": scope.get("schema"),
+            "compact": scope.get("compact", False),
+            "inputs": {name: inputs.get(name) for name in task_variables(task)},
+            "context": [output.raw for output in context_outputs],
+        }
+        if task.name in self.resume_dependent:
+            payload["resume"] = scope.get("resume")
+
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"{task.name}:{digest}"
+
+    def get(self, key, output_model=None):
+        """The cached TaskOutput, with its ``pydantic`` rebuilt as ``output_model``.
+
+        An entry that no longer validates against ``output_model`` counts as a miss.
+        """
+        from crewai.tasks.task_output import TaskOutput
+        from pydantic import ValidationError
+
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        structured = entry.pop("pydantic", None)
+        if output_model is not None and structured is not None:
+            try:
+                entry["pydantic"] = output_model.model_validate(structured)
+            except ValidationError:
+                return None
+        return TaskOutput(**entry)
+
+    def set(self, key, task, output):
+        entry = {
+            "name": output.name or task.name,
+            "description": output.description,
+            "expected_output": output.expected_output,
+            "raw": output.raw,
+            "json_dict": output.json_dict,
+            "pydantic": output.pydantic.model_dump() if output.pydantic is not None else None,
+            "agent": output.agent,
+        }
+        self.cache.set(key, entry, ttl=self.ttls[task.name])
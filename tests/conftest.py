@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Modules create data/ and knowledge/ relative to the working directory on import
+os.chdir(tempfile.mkdtemp(prefix="jobflowai-tests-"))
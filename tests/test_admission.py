@@ -0,0 +1,120 @@
+import pytest
+
+from admission import AdmissionQueue, Overloaded
+
+
+def drain(queue):
+    started = []
+    while True:
+        ready = queue.next_ready()
+        if ready is None:
+            return started
+        started.append(ready[0])
+
+
+def test_users_are_served_round_robin():
+    queue = AdmissionQueue(max_running=1, max_per_user=1, max_queued_per_user=5)
+    for job_id in ("a1", "a2", "a3"):
+        queue.enqueue(job_id, "alice")
+    queue.enqueue("b1", "bob")
+    queue.enqueue("c1", "carol")
+
+    order = []
+    while queue.depth():
+        job_id = queue.next_ready()[0]
+        order.append(job_id)
+        queue.finish(job_id)
+
+    assert order == ["a1", "b1", "c1", "a2", "a3"]
+
+
+def test_user_at_their_limit_is_skipped():
+    queue = AdmissionQueue(max_running=3, max_per_user=1)
+    queue.enqueue("a1", "alice")
+    queue.enqueue("a2", "alice")
+    queue.enqueue("b1", "bob")
+
+    assert drain(queue) == ["a1", "b1"]
+    queue.finish("a1")
+    assert drain(queue) == ["a2"]
+
+
+def test_api_key_limit_spans_users():
+    queue = AdmissionQueue(max_running=3, max_per_user=2, max_per_key=1)
+    queue.enqueue("a1", "alice", key="shared")
+    queue.enqueue("b1", "bob", key="shared")
+    queue.enqueue("c1", "carol", key="own")
+
+    assert drain(queue) == ["a1", "c1"]
+    queue.finish("a1")
+    assert drain(queue) == ["b1"]
+
+
+def test_weighted_job_waits_for_its_slots_and_holds_back_later_jobs():
+    queue = AdmissionQueue(max_running=2, max_per_user=2)
+    queue.enqueue("c1", "carol")
+    assert drain(queue) == ["c1"]
+
+    queue.enqueue("batch", "alice", weight=2)
+    queue.enqueue("b1", "bob")
+    # One slot is free, but the batch is first in line and needs two
+    assert drain(queue) == []
+
+    queue.finish("c1")
+    assert drain(queue) == ["batch"]
+    queue.finish("batch")
+    assert drain(queue) == ["b1"]
+
+
+def test_weight_is_capped_at_max_running():
+    queue = AdmissionQueue(max_running=2)
+    queue.enqueue("batch", "alice", weight=10)
+    assert drain(queue) == ["batch"]
+
+
+def test_payload_is_handed_back():
+    queue = AdmissionQueue(max_running=1)
+    queue.enqueue("a1", "alice", key="k", payload={"run": 1})
+    assert queue.next_ready() == ("a1", "alice", "k", {"run": 1})
+
+
+def test_full_queue_sheds_new_jobs():
+    queue = AdmissionQueue(max_running=1, max_queue=2, max_queued_per_user=5)
+    queue.enqueue("a1", "alice")
+    queue.enqueue("b1", "bob")
+    with pytest.raises(Overloaded):
+        queue.enqueue("c1", "carol")
+    assert queue.shed == 1
+    assert queue.depth() == 2
+
+
+def test_user_share_of_the_queue_is_capped():
+    queue = AdmissionQueue(max_running=1, max_queued_per_user=2)
+    queue.enqueue("a1", "alice")
+    queue.enqueue("a2", "alice")
+    with pytest.raises(Overloaded):
+        queue.enqueue("a3", "alice")
+    queue.enqueue("b1", "bob")
+    assert queue.shed == 1
+
+
+def test_position_follows_round_robin_order():
+    queue = AdmissionQueue(max_running=2, max_queued_per_user=5)
+    queue.run_time = 60
+    queue.enqueue("a1", "alice")
+    queue.enqueue("a2", "alice")
+    queue.enqueue("b1", "bob")
+
+    assert queue.position("a1") == (0, 60)
+    assert queue.position("b1") == (1, 60)
+    assert queue.position("a2") == (2, 120)
+    assert queue.position("missing") is None
+
+
+def test_finish_updates_the_run_time_average():
+    queue = AdmissionQueue(max_running=1)
+    queue.run_time = 100
+    queue.enqueue("a1", "alice")
+    queue.next_ready()
+    queue.finish("a1", run_time=200)
+    assert 100 < queue.run_time < 200
@@ -0,0 +1,40 @@
+import io
+
+import pytest
+
+import batch
+from batch import read_targets
+
+
+def test_headers_are_matched_loosely():
+    csv_bytes = ("﻿Company Name, Role ,EXPERIENCE,University Name\n"
+                 "Acme,Engineer,2 years,IIT Bombay\n"
+                 "Globex , Analyst ,,\n").encode("utf-8")
+
+    assert read_targets(csv_bytes) == [
+        {"company_name": "Acme", "role": "Engineer", "experience": "2 years", "university_name": "IIT Bombay"},
+        {"company_name": "Globex", "role": "Analyst", "experience": "", "university_name": ""},
+    ]
+
+
+def test_file_objects_are_read():
+    targets = read_targets(io.BytesIO(b"company_name,role,experience\nAcme,Engineer,Senior\n"))
+    assert targets == [{"company_name": "Acme", "role": "Engineer", "experience": "Senior"}]
+
+
+def test_rows_without_company_or_role_are_skipped():
+    text = "company_name,role,experience\nAcme,,Junior\n,Engineer,Junior\nAcme,Engineer,Junior\n"
+    assert [target["company_name"] for target in read_targets(text)] == ["Acme"]
+
+
+def test_missing_columns_are_reported():
+    with pytest.raises(ValueError, match="experience"):
+        read_targets("company_name,role\nAcme,Engineer\n")
+
+
+def test_too_many_rows_are_refused(monkeypatch):
+    monkeypatch.setattr(batch, "MAX_BATCH_ITEMS", 2)
+    text = "company_name,role,experience\n" + "".join(f"Company {n},Engineer,Junior\n" for n in range(3))
+
+    with pytest.raises(ValueError, match="at most 2"):
+        read_targets(text)
@@ -0,0 +1,109 @@
+import contextvars
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from dag_executor import build_dependency_graph, run_graph
+
+
+def make_tasks(count):
+    return [SimpleNamespace(context=None) for _ in range(count)]
+
+
+def test_graph_follows_explicit_contexts():
+    tasks = make_tasks(4)
+    tasks[1].context = [tasks[0]]
+    tasks[3].context = [tasks[1], tasks[2]]
+
+    assert build_dependency_graph(tasks) == {0: [], 1: [0], 2: [], 3: [1, 2]}
+
+
+def test_sequential_graph_depends_on_every_earlier_task():
+    tasks = make_tasks(3)
+    tasks[2].context = [tasks[0]]
+
+    assert build_dependency_graph(tasks, sequential=True) == {0: [], 1: [0], 2: [0]}
+
+
+def test_cycle_is_rejected():
+    tasks = make_tasks(2)
+    tasks[0].context = [tasks[1]]
+    tasks[1].context = [tasks[0]]
+
+    with pytest.raises(ValueError, match="cycle"):
+        build_dependency_graph(tasks)
+
+
+def test_context_outside_the_crew_is_rejected():
+    tasks = make_tasks(1)
+    tasks[0].context = [SimpleNamespace(context=None)]
+
+    with pytest.raises(ValueError, match="not part of the crew"):
+        build_dependency_graph(tasks)
+
+
+def test_nodes_start_after_their_dependencies():
+    graph = {0: [], 1: [0], 2: [0], 3: [1, 2]}
+    finished = []
+    lock = threading.Lock()
+
+    def run_node(node, dep_results):
+        with lock:
+            assert all(dep in finished for dep in graph[node])
+        time.sleep(0.01)
+        with lock:
+            finished.append(node)
+        return node * 10, dep_results
+
+    completed = []
+    results = run_graph(graph, run_node, max_concurrency=4, on_complete=lambda node, _: completed.append(node))
+
+    assert results[3] == (30, [(10, [(0, [])]), (20, [(0, [])])])
+    assert sorted(completed) == [0, 1, 2, 3]
+    assert completed[0] == 0 and completed[-1] == 3
+
+
+def test_at_most_max_concurrency_nodes_run_at_once():
+    graph = {node: [] for node in range(8)}
+    running = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def run_node(node, dep_results):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.02)
+        with lock:
+            running["now"] -= 1
+
+    run_graph(graph, run_node, max_concurrency=2)
+    assert running["peak"] == 2
+
+
+def test_failure_is_raised_and_dependents_never_run():
+    graph = {0: [], 1: [0], 2: [1]}
+    ran = []
+
+    def run_node(node, dep_results):
+        ran.append(node)
+        if node == 1:
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_graph(graph, run_node)
+    assert ran == [0, 1]
+
+
+def test_unsatisfiable_dependencies_are_reported():
+    with pytest.raises(ValueError):
+        run_graph({0: [1]}, lambda node, dep_results: None)
+
+
+def test_nodes_see_the_callers_context_variables():
+    variable = contextvars.ContextVar("variable", default=None)
+    variable.set("caller")
+
+    results = run_graph({0: [], 1: [0]}, lambda node, dep_results: variable.get())
+    assert results == {0: "caller", 1: "caller"}
@@ -0,0 +1,30 @@
+import pytest
+
+from matcher import parse_salary_range, salary_amounts, salary_matches
+
+
+@pytest.mark.parametrize("text, amounts", [
+    ("$95,000", [95000]),
+    ("120000", [120000]),
+    ("90k - 120k", [90000, 120000]),
+    ("₹12,00,000 per annum", [1200000]),
+    ("12 LPA", [1200000]),
+    ("10-15 lakhs", [1000000, 1500000]),
+    ("1.5 Cr", [15000000]),
+    ("5 years experience, 12 keywords", []),
+])
+def test_salary_amounts(text, amounts):
+    assert salary_amounts(text) == amounts
+
+
+def test_salary_range_shares_its_unit():
+    assert parse_salary_range("10-15 LPA") == (1000000, 1500000)
+    assert parse_salary_range("competitive") is None
+
+
+def test_salary_matches():
+    assert salary_matches({"snippet": "₹12,00,000 per annum"}, "1000000-1500000")
+    assert salary_matches({"snippet": "12 LPA"}, "1000000-1500000")
+    assert not salary_matches({"snippet": "30 LPA"}, "10-15 LPA")
+    # Years and postings without pay never rule a posting out
+    assert salary_matches({"title": "Engineer 2025", "snippet": "Apply now"}, "90000-120000")
@@ -0,0 +1,100 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from search_client import BACKOFF_BASE, BACKOFF_MAX, SearchError, SerperSearchClient, _serve_mock, backoff_delay
+
+
+@pytest.fixture
+def mock_serper():
+    servers = []
+
+    def start(latency=0.0, fail_every=0):
+        server, hits = _serve_mock(latency, fail_every)
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/search", hits
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def make_client():
+    clients = []
+
+    def make(url, **kwargs):
+        client = SerperSearchClient(api_key="test", url=url, rate=100, burst=100, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def test_identical_in_flight_queries_share_one_request(mock_serper, make_client):
+    url, hits = mock_serper(latency=0.3)
+    client = make_client(url)
+    start = threading.Barrier(8)
+
+    def search(query):
+        start.wait()
+        return client.run(query)
+
+    queries = ["python jobs", "Python  jobs", " python jobs "] + ["python jobs"] * 5
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(search, queries))
+
+    assert hits["count"] == 1
+    assert client.requests == 1
+    assert client.coalesced == 7
+    assert all(result == results[0] for result in results)
+
+
+def test_distinct_queries_are_not_coalesced(mock_serper, make_client):
+    url, hits = mock_serper()
+    client = make_client(url)
+
+    assert client.run("first")["searchParameters"]["q"] == "first"
+    assert client.run("second")["searchParameters"]["q"] == "second"
+    assert hits["count"] == 2
+    assert client.coalesced == 0
+
+
+def test_rate_limited_request_is_retried(mock_serper, make_client):
+    # The mock answers every second request with a 429 and Retry-After: 0.1
+    url, hits = mock_serper(fail_every=2)
+    client = make_client(url)
+
+    client.run("first")
+    result = client.run("second")
+
+    assert result["searchParameters"]["q"] == "second"
+    assert hits["count"] == 3
+    assert client.retries == 1
+
+
+def test_search_error_once_retries_are_spent(mock_serper, make_client):
+    url, hits = mock_serper(fail_every=1)
+    client = make_client(url, max_retries=2)
+
+    with pytest.raises(SearchError, match="after 3 attempts"):
+        client.run("always limited")
+    assert hits["count"] == 3
+    assert client.retries == 2
+
+
+def test_backoff_honours_retry_after_up_to_the_cap():
+    assert backoff_delay(1, "2") == 2.0
+    assert backoff_delay(1, "600") == BACKOFF_MAX
+
+
+def test_backoff_jitter_stays_within_bounds():
+    for attempt in range(1, 10):
+        for _ in range(50):
+            assert 0 <= backoff_delay(attempt) <= min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+    # An unparseable Retry-After falls back to jitter
+    assert 0 <= backoff_delay(1, "soon") <= BACKOFF_BASE * 2
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from task_cache import TaskCache
+
+SCOPE = {"model": "gemini/gemini-2.0-flash-lite", "schema": 2, "compact": False, "resume": "abc"}
+INPUTS = {"company_name": "Acme", "role": "Engineer", "university_name": "IIT Bombay"}
+
+
+def make_task(name, description="Research {company_name} for a {role}"):
+    agent = SimpleNamespace(role="Researcher", goal="Find facts", backstory="Thorough.")
+    return SimpleNamespace(name=name, description=description, expected_output="JSON", agent=agent)
+
+
+def output(raw):
+    return SimpleNamespace(raw=raw)
+
+
+def test_uncached_task_has_no_key():
+    assert TaskCache(cache=None).key_for(make_task("ats_agent"), INPUTS, [], SCOPE) is None
+
+
+def test_key_is_stable_and_names_the_task():
+    cache = TaskCache(cache=None)
+    key = cache.key_for(make_task("company_insider"), INPUTS, [], SCOPE)
+
+    assert key.startswith("company_insider:")
+    assert key == cache.key_for(make_task("company_insider"), dict(INPUTS), [], dict(SCOPE))
+
+
+def test_key_only_depends_on_variables_the_task_reads():
+    cache = TaskCache(cache=None)
+    task = make_task("company_insider")
+    key = cache.key_for(task, INPUTS, [], SCOPE)
+
+    assert cache.key_for(task, {**INPUTS, "university_name": "MIT"}, [], SCOPE) == key
+    assert cache.key_for(task, {**INPUTS, "company_name": "Globex"}, [], SCOPE) != key
+
+
+def test_key_changes_with_model_schema_and_prompt_mode():
+    cache = TaskCache(cache=None)
+    task = make_task("company_insider")
+    key = cache.key_for(task, INPUTS, [], SCOPE)
+
+    for change in ({"model": "other"}, {"schema": 3}, {"compact": True}):
+        assert cache.key_for(task, INPUTS, [], {**SCOPE, **change}) != key
+
+
+def test_key_changes_with_context_outputs():
+    cache = TaskCache(cache=None)
+    task = make_task("hr_hunter")
+
+    assert (cache.key_for(task, INPUTS, [output("one")], SCOPE)
+            != cache.key_for(task, INPUTS, [output("two")], SCOPE))
+
+
+def test_only_resume_dependent_tasks_key_on_the_resume():
+    cache = TaskCache(cache=None)
+    other_resume = {**SCOPE, "resume": "def"}
+
+    company = make_task("company_insider")
+    assert cache.key_for(company, INPUTS, [], SCOPE) == cache.key_for(company, INPUTS, [], other_resume)
+    questions = make_task("interview_insight")
+    assert cache.key_for(questions, INPUTS, [], SCOPE) != cache.key_for(questions, INPUTS, [], other_resume)
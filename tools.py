@@ -1,15 +1,95 @@
-## https://serper.dev/
-import os
-from dotenv import load_dotenv
-from crewai_tools import SerperDevTool
-load_dotenv()
-os.environ['SERPER_API_KEY'] = os.getenv('SERPER_API_KEY')
-
-# inititlaize the tool for internet searching capabilities
-search_tool = SerperDevTool()
-
-'''@tool('save_search_results')
-def save_search_results(response):
-    file_paths = [item.strip() for item in response.split(',')]
-    content_source = CrewDoclingSource(file_paths=file_paths)
-    return content_source'''
+## https://serper.dev/
+import os
+import re
+import time
+from typing import Any
+from dotenv import load_dotenv
+from crewai.tools import BaseTool
+from cache import search_cache
+from evidence import current_evidence
+from metrics import record
+from search_client import SerperSearchClient
+load_dotenv()
+os.environ['SERPER_API_KEY'] = os.getenv('SERPER_API_KEY', '')
+
+
+def normalize_query(query):
+    # Case and whitespace differences should not produce separate cache entries
+    return re.sub(r"\s+", " ", str(query)).strip().lower()
+
+
+class CachedSearchTool(BaseTool):
+    """Wraps a search tool and serves repeated queries from a PersistentCache.
+
+    While a run's EvidenceStore is current, queries already answered in that
+    run are served from it first and every new result is added to it.
+    ``backend`` only needs a ``run(search_query=...)`` method, so a local fake
+    can stand in for SerperSearchClient.
+    """
+    backend: Any
+    cache: Any
+
+    def _run(self, **kwargs):
+        query = kwargs.get("search_query") or kwargs.get("query") or ""
+        key = normalize_query(query)
+        evidence = current_evidence()
+        if evidence is not None:
+            found = evidence.get(key)
+            if found is not None:
+                record(search_calls=1, evidence_hits=1)
+                return found
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            record(search_calls=1, search_cache_hits=1)
+            result = cached
+        else:
+            started = time.perf_counter()
+            result = self.backend.run(**kwargs)
+            record(search_calls=1, search_time=time.perf_counter() - started)
+            self.cache.set(key, result)
+        if evidence is not None:
+            evidence.add(key, query, result)
+        return result
+
+
+def cached_search_tool(backend, cache):
+    return CachedSearchTool(
+        name=backend.name,
+        description=backend.description,
+        args_schema=backend.args_schema,
+        backend=backend,
+        cache=cache,
+    )
+
+
+class BudgetedDelegationTool(BaseTool):
+    """Wraps a delegation tool and refuses once the task's delegation budget is spent."""
+    tool: Any
+    tracker: Any
+
+    def _run(self, *args, **kwargs):
+        if not self.tracker.try_delegate():
+            return ("Delegation budget used up for this task. Do not delegate again; "
+                    "finish the task with the information you already have.")
+        return self.tool._run(*args, **kwargs)
+
+
+def budgeted_delegation_tool(tool, tracker):
+    return BudgetedDelegationTool(
+        name=tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema,
+        tool=tool,
+        tracker=tracker,
+    )
+
+
+# inititlaize the tool for internet searching capabilities; one pooled, rate-limited client per process
+search_tool = cached_search_tool(SerperSearchClient(), search_cache)
+
+'''@tool('save_search_results')
+def save_search_results(response):
+    file_paths = [item.strip() for item in response.split(',')]
+    content_source = CrewDoclingSource(file_paths=file_paths)
+    return content_source'''